@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Benchmark of the knapsack engines of solver.py over the instances of the data directory.
+# Each (instance, engine) run happens in its own process, which gives its peak RSS.
+# Results are written as csv and json, and compared to a stored baseline:
+# the script exits with code 1 when a run is slower than threshold x its baseline time.
+#
+# example:
+#   python benchmark.py --output baseline
+#   python benchmark.py --baseline baseline.json --threshold 1.5
+
+from __future__ import print_function
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import solver
+
+# runs faster than this (in seconds) are compared to this time instead, to ignore timing noise
+MIN_SECONDS = 0.1
+# extra time given to a run after its time limit before it is killed
+GRACE_SECONDS = 5.0
+COLUMNS = ['instance', 'method', 'status', 'seconds', 'peakrssmb', 'objective', 'optimal']
+
+def GetPeakRSS():
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024.0**2 if sys.platform == 'darwin' else 1024.0), 1)
+
+def RunBenchmark(file_location, method, core, timelimit, connection):
+    solver.VERBOSE = False
+    row = {}
+    row['instance'] = os.path.basename(file_location)
+    row['method'] = method
+    start = time.time()
+    try:
+        results = solver.SolveInputs(solver.ReadInputArrays(file_location), method, core, timelimit=timelimit)
+        objective, optimal = results.splitlines()[0].split()
+        row['status'] = 'ok'
+        row['objective'] = int(objective)
+        row['optimal'] = int(optimal)
+    except Exception as e:
+        row['status'] = type(e).__name__
+        row['objective'] = None
+        row['optimal'] = None
+    row['seconds'] = round(time.time() - start, 3)
+    row['peakrssmb'] = GetPeakRSS()
+    connection.send(row)
+    connection.close()
+
+# run one (instance, engine) pair in a fresh process, killed if it overruns its time limit
+def RunIsolatedBenchmark(file_location, method, core, timelimit):
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=RunBenchmark, args=(file_location, method, core, timelimit, sender))
+    start = time.time()
+    process.start()
+    timeout = timelimit + GRACE_SECONDS if timelimit is not None else None
+    if receiver.poll(timeout):
+        row = receiver.recv()
+    else:
+        row = {}
+        row['instance'] = os.path.basename(file_location)
+        row['method'] = method
+        row['status'] = 'killed'
+        row['seconds'] = round(time.time() - start, 3)
+        row['peakrssmb'] = None
+        row['objective'] = None
+        row['optimal'] = None
+    if process.is_alive():
+        process.terminate()
+    process.join()
+    return row
+
+def RunBenchmarks(files, methods, core, timelimit):
+    rows = []
+    for file_location in files:
+        for method in methods:
+            row = RunIsolatedBenchmark(file_location, method, core, timelimit)
+            solver.LogInfo(' '.join(str(row[c]) for c in COLUMNS))
+            rows.append(row)
+    return rows
+
+def WriteResults(rows, output):
+    with open(output + '.csv', 'w') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(output + '.json', 'w') as jsonfile:
+        json.dump(rows, jsonfile, indent=1)
+    solver.LogInfo('Results written to ' + output + '.csv and ' + output + '.json')
+
+# compare the runs to the baseline; returns the list of regressions found
+def CompareToBaseline(rows, baseline, threshold):
+    baselinerows = {(row['instance'], row['method']): row for row in baseline}
+    regressions = []
+    for row in rows:
+        reference = baselinerows.get((row['instance'], row['method']))
+        if reference is None or reference['status'] != 'ok':
+            continue
+        name = row['instance'] + ' ' + row['method']
+        if row['status'] != 'ok':
+            regressions.append(name + ': ' + row['status'] + ' (baseline ok)')
+            continue
+        ratio = max(row['seconds'], MIN_SECONDS) / max(reference['seconds'], MIN_SECONDS)
+        if ratio > threshold:
+            regressions.append(name + ': ' + str(row['seconds']) + 's vs ' + str(reference['seconds'])
+                               + 's (x' + str(round(ratio, 2)) + ')')
+        if row['objective'] != reference['objective'] or row['optimal'] != reference['optimal']:
+            solver.LogInfo('Warning: ' + name + ' objective ' + str(row['objective']) + ' (optimal='
+                           + str(row['optimal']) + ') vs ' + str(reference['objective']) + ' (optimal='
+                           + str(reference['optimal']) + ') in the baseline')
+    return regressions
+
+def main(args):
+    files = sorted(glob.glob(os.path.join(args.data, args.pattern)))
+    methods = args.methods.split(',') if args.methods else list(solver.ENGINES)
+    solver.LogInfo('Benchmarking ' + str(len(methods)) + ' engines on ' + str(len(files)) + ' instances...')
+    rows = RunBenchmarks(files, methods, args.core, args.timelimit)
+    WriteResults(rows, args.output)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, 'r') as baselinefile:
+        baseline = json.load(baselinefile)
+    regressions = CompareToBaseline(rows, baseline, args.threshold)
+    for regression in regressions:
+        solver.LogInfo('Regression: ' + regression)
+    solver.LogInfo(str(len(regressions)) + ' regressions above x' + str(args.threshold))
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the knapsack engines.')
+    parser.add_argument('--data', default='./data', help='directory of the instances')
+    parser.add_argument('--pattern', default='ks_*', help='file pattern of the instances')
+    parser.add_argument('--methods', default=None, help='comma separated engines (default: all of solver.ENGINES)')
+    parser.add_argument('--core', action='store_true', help='solve the core problem only')
+    parser.add_argument('--timelimit', type=float, default=60.0, help='time limit of each run, in seconds')
+    parser.add_argument('--output', default='benchmark', help='prefix of the csv and json result files')
+    parser.add_argument('--baseline', default=None, help='json results to compare to')
+    parser.add_argument('--threshold', type=float, default=1.5, help='maximum slowdown ratio against the baseline')
+    sys.exit(main(parser.parse_args()))
@@ -7,10 +7,13 @@ import os
 from subprocess import Popen, PIPE
 from ortools.linear_solver import pywraplp
 from datetime import datetime
+from bisect import bisect_right
+import time
+import numpy as np
 
 def GetInputs(input_data):
     input_data = input_data.splitlines()
-    input_data = [list(map(int, x.split(' ')))  for x in input_data]
+    input_data = [list(map(int, x.split()))  for x in input_data if x.strip()]
     inputs={}
     inputs['size'] = input_data[0][0]
     inputs['capacity'] = input_data[0][1]
@@ -18,86 +21,993 @@ def GetInputs(input_data):
     inputs['weights'] = [row[1] for row in input_data[1:]]
     return inputs
 
+# vectorized parser: the whole text is converted to int64 in a single NumPy call, and the two
+# columns are copied once into contiguous 'values' and 'weights' arrays, that the engines use as is.
+# The number of values on the first line selects the format (see GetInputsFromNumbers).
+def GetInputArrays(input_data):
+    headersize = len(input_data.lstrip().split('\n', 1)[0].split())
+    return GetInputsFromNumbers(np.fromstring(input_data, dtype=np.int64, sep=' '), headersize)
+
+# same as GetInputArrays, reading the numbers straight from the file
+def ReadInputArrays(file_location):
+    with open(file_location, 'r') as input_data_file:
+        header = input_data_file.readline()
+        while header and not header.strip():
+            header = input_data_file.readline()
+    return GetInputsFromNumbers(np.fromfile(file_location, dtype=np.int64, sep=' '), len(header.split()))
+
+# classic format:  'size capacity' then one 'value weight' line per item.
+# extended format: 'size dimensions knapsacks', then one line of 'dimensions' capacities per
+# knapsack, then one 'value weight_1 ... weight_d' line per item. Extended instances have
+# 'capacities' (knapsacks x dimensions) and 'weights' (size x dimensions) matrices instead of
+# 'capacity' and a weights vector.
+def GetInputsFromNumbers(numbers, headersize=2):
+    size = int(numbers[0])
+    inputs = {}
+    inputs['size'] = size
+    if headersize == 2:
+        columns = numbers[2:2 + 2 * size].reshape(size, 2).T.copy()
+        inputs['capacity'] = int(numbers[1])
+        inputs['values'] = columns[0]
+        inputs['weights'] = columns[1]
+        return inputs
+    dimensions = int(numbers[1])
+    knapsacks = int(numbers[2])
+    start = 3 + dimensions * knapsacks
+    rows = numbers[start:start + (dimensions + 1) * size].reshape(size, dimensions + 1)
+    inputs['dimensions'] = dimensions
+    inputs['knapsacks'] = knapsacks
+    inputs['capacities'] = numbers[3:start].reshape(knapsacks, dimensions).copy()
+    inputs['values'] = rows[:, 0].copy()
+    inputs['weights'] = rows[:, 1:].copy()
+    return inputs
+
+# True for the instances with several dimensions or knapsacks (extended format)
+def IsMultiKnapsack(inputs):
+    return 'capacities' in inputs
+
+# parse time and peak memory of the list-based and the vectorized parsers
+# example: BenchmarkParsers('./data/ks_10000_0')
+def BenchmarkParsers(file_location, repeat=10):
+    import tracemalloc
+    with open(file_location, 'r') as input_data_file:
+        input_data = input_data_file.read()
+    parsers = [('GetInputs', lambda: GetInputs(input_data)),
+               ('GetInputArrays', lambda: GetInputArrays(input_data)),
+               ('ReadInputArrays', lambda: ReadInputArrays(file_location))]
+    for name, parser in parsers:
+        start = time.time()
+        for _ in range(repeat):
+            parser()
+        elapsed = (time.time() - start) / repeat
+        tracemalloc.start()
+        parser()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        LogInfo(name + ': ' + str(round(elapsed * 1000, 2)) + ' ms, peak memory '
+                + str(round(peak / 1024, 1)) + ' KB')
+
+# set to False to silence the logs and the printed solutions (e.g. in batch workers)
+VERBOSE = True
+
 def LogInfo(msg):
-    print(datetime.now().strftime('%H:%M:%S') + ' - ' + msg)
-    
-def SolveWithORToolsMIP(input_data):
-    # Get inputs
-    inputs = GetInputs(input_data)
+    if VERBOSE:
+        print(datetime.now().strftime('%H:%M:%S') + ' - ' + msg)
 
-    # Solver
-    # options: GLOP_LINEAR_PROGRAMMING, CBC_MIXED_INTEGER_PROGRAMMING
-    solver = pywraplp.Solver('KnapsackSolver', pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING)
+# time limits are given in seconds and turned into deadlines; None means no limit
+def GetDeadline(timelimit):
+    return time.time() + timelimit if timelimit is not None else None
 
-    # Objective function: maximize the value of the knapsack
-    objective = solver.Objective()
-    objective.SetMaximization()
+def GetRemainingTime(deadline):
+    return max(0.0, deadline - time.time()) if deadline is not None else None
 
-    # Constraint on capacity
-    constraint = solver.Constraint(0, inputs['capacity'])
-        
-    # Variables
-    variables = []
-    for i in range(inputs['size']):
-        x = solver.BoolVar('x' + str(i))
-        variables.append(x)
-        # add to constraint
-        constraint.SetCoefficient(x, inputs['weights'][i])
-        # add to objective
-        objective.SetCoefficient(x, inputs['values'][i])
-
-    # Solve
+def IsExpired(deadline):
+    return deadline is not None and time.time() > deadline
+
+# engines report every improving solution to the optional callback, as an outputs dict
+def ReportIncumbent(callback, objective, variables):
+    if callback is not None:
+        outputs = {}
+        outputs['objective'] = objective
+        outputs['variables'] = list(variables)
+        callback(outputs)
+    
+# The greedy solution is the first incumbent.
+# With reduction=True, the items whose LP value cannot be flipped without falling below the
+# incumbent (see GetFlipBounds) are fixed before building the model,
+# and CBC only sees the remaining free items.
+def RunORToolsMIP(inputs, reduction=True, timelimit=None, callback=None):
+    size = inputs['size']
+    capacity = int(inputs['capacity'])
+    results = [0] * size
+    fixedvalue = 0
+    items = list(range(size))
+    lp = GetLPRelaxation(inputs)
+    incumbent, incumbentresults = GetGreedySolution(inputs, lp['order'])
+    ReportIncumbent(callback, incumbent, incumbentresults)
+    LogInfo('LP bound: ' + str(lp['bound']) + ', greedy incumbent: ' + str(incumbent)
+            + ', gap: ' + str(lp['bound'] - incumbent))
+    if reduction:
+        fixed = GetFlipBounds(lp) <= incumbent
+        fixedin = lp['order'][:lp['break']]
+        fixedin = fixedin[fixed[fixedin]].tolist()
+        for i in fixedin:
+            results[i] = 1
+            capacity -= int(inputs['weights'][i])
+            fixedvalue += int(inputs['values'][i])
+        items = np.flatnonzero(~fixed).tolist()
+        LogInfo('Reduction fixed ' + str(size - len(items)) + ' of ' + str(size) + ' variables ('
+                + str(len(fixedin)) + ' in, ' + str(size - len(items) - len(fixedin)) + ' out)')
+
+    # Solve, without relative gap so that OPTIMAL means proven optimal
+    weights = np.asarray(inputs['weights'], dtype=np.int64)[items]
+    model = GetMIPModel(np.asarray(inputs['values'], dtype=np.int64)[items], weights[:, None], [[capacity]])
     LogInfo('Start solving...')
-    solver.Solve()
+    status, solution = SolveMIPModel(model, timelimit)
     LogInfo('Solver finished.')
 
-    results = []
-    for i in range(inputs['size']):
-        results.append(int(variables[i].solution_value()))
-    objectiveValue = objective.Value()    
+    optimal = status == pywraplp.Solver.OPTIMAL
+    objectiveValue = -1
+    if solution is not None:
+        objectiveValue = fixedvalue
+        for i, x in zip(items, solution.tolist()):
+            results[i] = int(round(x))
+            objectiveValue += results[i] * int(inputs['values'][i])
+    if objectiveValue <= incumbent:
+        # the fixing only keeps the solutions better than the incumbent
+        objectiveValue, results = incumbent, incumbentresults
+    else:
+        ReportIncumbent(callback, objectiveValue, results)
 
     # Results
-    print('Number of variables =', solver.NumVariables())
-    print('Number of constraints =', solver.NumConstraints())
-    print('x = ', results)
-    print('Optimal objective value =', objectiveValue)
+    if VERBOSE:
+        print('Number of variables =', len(model.variable))
+        print('Number of constraints =', len(model.constraint))
+        print('x = ', results)
+        print('Optimal objective value =', objectiveValue)
 
     outputs = {}
-    outputs['objective'] = int(objectiveValue)
+    outputs['objective'] = objectiveValue
     outputs['variables'] = results
+    outputs['optimal'] = optimal
+    return outputs
 
-    # Return
-    results = str(outputs['objective']) + ' 0\n' + ' '.join(map(str, outputs['variables'])) 
-    print('****************************************************')
-    print(results)
-    return results
+def SolveWithORToolsMIP(input_data):
+    return solve_it(input_data, 'mip', core=False, reduction=False)
 
-def SolveWithORToolsBinPacking(input_data):
-    # Get inputs
-    inputs = GetInputs(input_data)
+# MIP model of the multiple multi-dimensional knapsack, built in bulk from NumPy arrays instead
+# of one SetCoefficient call per item: values (size), weights (size x dimensions) and
+# capacities (knapsacks x dimensions). Variable i * knapsacks + k is 1 when item i is packed
+# in knapsack k.
+def GetMIPModel(values, weights, capacities):
+    from ortools.linear_solver import linear_solver_pb2
+    values = np.asarray(values, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.int64)
+    capacities = np.asarray(capacities, dtype=np.int64)
+    size = len(values)
+    knapsacks, dimensions = capacities.shape
+    model = linear_solver_pb2.MPModelProto()
+    model.maximize = True
+    model.variable.extend(linear_solver_pb2.MPVariableProto(lower_bound=0, upper_bound=1, is_integer=True,
+                                                            objective_coefficient=value)
+                          for value in np.repeat(values, knapsacks).tolist())
+    # one capacity constraint per knapsack and dimension
+    for k in range(knapsacks):
+        for d in range(dimensions):
+            items = np.flatnonzero(weights[:, d])
+            model.constraint.add(var_index=(items * knapsacks + k).tolist(),
+                                 coefficient=weights[items, d].tolist(),
+                                 upper_bound=int(capacities[k, d]))
+    # each item is packed at most once
+    if knapsacks > 1:
+        indices = np.arange(size * knapsacks).reshape(size, knapsacks).tolist()
+        ones = [1] * knapsacks
+        model.constraint.extend(linear_solver_pb2.MPConstraintProto(var_index=row, coefficient=ones, upper_bound=1)
+                                for row in indices)
+    return model
+
+# solve a MIP model with CBC, without relative gap so that OPTIMAL means proven optimal.
+# Returns the status and the values of the variables (None when no solution was found).
+def SolveMIPModel(model, timelimit=None):
+    from ortools.linear_solver import linear_solver_pb2
+    solver = pywraplp.Solver('KnapsackSolver', pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING)
+    error = solver.LoadModelFromProto(model)
+    if error:
+        raise ValueError('invalid model: ' + error)
+    if timelimit is not None:
+        solver.SetTimeLimit(int(timelimit * 1000))
+    parameters = pywraplp.MPSolverParameters()
+    parameters.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, 0.0)
+    status = solver.Solve(parameters)
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        return status, None
+    response = linear_solver_pb2.MPSolutionResponse()
+    solver.FillSolutionResponseProto(response)
+    return status, np.array(response.variable_value)
+
+# MIP for the extended instances: each variable is 0 when the item is not packed,
+# otherwise the number (from 1) of its knapsack
+def RunORToolsMultiMIP(inputs, timelimit=None, callback=None):
+    size = inputs['size']
+    values = np.asarray(inputs['values'], dtype=np.int64)
+    capacities = np.asarray(inputs['capacities'], dtype=np.int64)
+    model = GetMIPModel(values, np.asarray(inputs['weights'], dtype=np.int64).reshape(size, -1), capacities)
+    LogInfo('Model built: ' + str(len(model.variable)) + ' variables, ' + str(len(model.constraint)) + ' constraints')
+    status, solution = SolveMIPModel(model, timelimit)
+    LogInfo('Solver finished.')
+    results = np.zeros(size, dtype=np.int64)
+    if solution is not None:
+        solution = solution.reshape(size, len(capacities)) > 0.5
+        packed = solution.any(axis=1)
+        results[packed] = solution[packed].argmax(axis=1) + 1
+    results = results.tolist()
+    objectiveValue = int(values[np.flatnonzero(results)].sum())
+    ReportIncumbent(callback, objectiveValue, results)
+    outputs = {}
+    outputs['objective'] = objectiveValue
+    outputs['variables'] = results
+    outputs['optimal'] = status == pywraplp.Solver.OPTIMAL
+    return outputs
+
+# the OR-tools knapsack solver handles several dimensions, but a single knapsack
+def RunORToolsBinPacking(inputs, timelimit=None, callback=None):
+    capacities = inputs['capacities'] if IsMultiKnapsack(inputs) else [[inputs['capacity']]]
+    if len(capacities) > 1:
+        raise ValueError('binpacking only supports a single knapsack')
     # Create the solver
     from ortools.algorithms import pywrapknapsack_solver
     solver = pywrapknapsack_solver.KnapsackSolver(
         pywrapknapsack_solver.KnapsackSolver.KNAPSACK_MULTIDIMENSION_BRANCH_AND_BOUND_SOLVER,
         'knapsack')
-    solver.Init(inputs['values'], [inputs['weights']], [inputs['capacity']])
+    values = [int(v) for v in inputs['values']]
+    weights = np.asarray(inputs['weights'], dtype=np.int64).reshape(inputs['size'], -1).T.tolist()
+    solver.Init(values, weights, [int(c) for c in capacities[0]])
+    if timelimit is not None:
+        solver.set_time_limit(timelimit)
     objectiveValue = solver.Solve()
+    # an item packed in the single knapsack is 1, for the classic and the extended instances
     results = [int(solver.BestSolutionContains(x)) for x in range(inputs['size'])]
-    objective = sum([x*v for x,v in zip(inputs['values'], results)])
-    print('x = ', results)
-    print('Optimal objective value =', objectiveValue)
+    ReportIncumbent(callback, int(objectiveValue), results)
+    if VERBOSE:
+        print('x = ', results)
+        print('Optimal objective value =', objectiveValue)
     outputs = {}
     outputs['objective'] = int(objectiveValue)
     outputs['variables'] = results
+    outputs['optimal'] = solver.IsSolutionOptimal()
+    return outputs
+
+def SolveWithORToolsBinPacking(input_data):
+    return solve_it(input_data, 'binpacking', core=False)
+
+# default memory budget (in bytes) of the dynamic programming engines
+MEMORY_BUDGET = 512 * 1024**2
+
+# estimated memory (in bytes) used by the dynamic programming engine:
+# one packed bit per (item, capacity) for the decisions, plus a few capacity-indexed work arrays
+def GetDynamicProgrammingMemory(size, capacity):
+    decisions = size * ((capacity + 8) // 8)
+    workarrays = (capacity + 1) * (8 + 8 + 1 + 1)
+    return decisions + workarrays
+
+# capacity-indexed dynamic programming, one vectorized np.maximum per item.
+# bestvalues[c] is the best value reachable with a total weight <= c;
+# decisions[i] holds, as packed bits, the capacities for which item i is taken.
+# Returns None if the deadline is reached before the end.
+def BuildDynamicProgrammingTable(inputs, deadline=None):
+    capacity = inputs['capacity']
+    values = np.asarray(inputs['values'], dtype=np.int64)
+    weights = np.asarray(inputs['weights'], dtype=np.int64)
+    bestvalues = np.zeros(capacity + 1, dtype=np.int64)
+    decisions = np.zeros((inputs['size'], (capacity + 8) // 8), dtype=np.uint8)
+    taken = np.zeros(capacity + 1, dtype=bool)
+    for i in range(inputs['size']):
+        if IsExpired(deadline):
+            return None
+        w = int(weights[i])
+        if w > capacity:
+            continue
+        # value of each capacity if item i is added on top of the row shifted by its weight
+        shifted = bestvalues[:capacity + 1 - w] + values[i]
+        taken[:w] = False
+        np.greater(shifted, bestvalues[w:], out=taken[w:])
+        np.maximum(bestvalues[w:], shifted, out=bestvalues[w:])
+        decisions[i] = np.packbits(taken)
+    table = {}
+    table['capacity'] = capacity
+    table['weights'] = weights
+    table['bestvalues'] = bestvalues
+    table['decisions'] = decisions
+    return table
+
+# traceback of the packed decisions, starting from the last item and the given capacity
+def RecoverItems(table, capacity):
+    decisions = table['decisions']
+    weights = table['weights']
+    results = [0] * len(decisions)
+    c = capacity
+    for i in range(len(decisions) - 1, -1, -1):
+        if (decisions[i, c >> 3] >> (7 - (c & 7))) & 1:
+            results[i] = 1
+            c -= int(weights[i])
+    return results
+
+# value-only pass of the dynamic programming, with O(capacity) memory.
+# Returns None if the deadline is reached before the end.
+def GetBestValues(values, weights, capacity, deadline=None):
+    bestvalues = np.zeros(capacity + 1, dtype=np.int64)
+    for v, w in zip(values.tolist(), weights.tolist()):
+        if IsExpired(deadline):
+            return None
+        if w > capacity:
+            continue
+        shifted = bestvalues[:capacity + 1 - w] + v
+        np.maximum(bestvalues[w:], shifted, out=bestvalues[w:])
+    return bestvalues
+
+# Hirschberg-style divide and conquer: the optimal value only needs O(capacity) memory,
+# the items are then recovered by splitting the item list in two halves,
+# finding how the capacity is shared between them, and recursing on each half.
+# Sub-problems whose decision table fits in the memory budget are solved with a plain traceback.
+def RunDivideAndConquerDP(inputs, memorybudget=MEMORY_BUDGET, timelimit=None, callback=None):
+    capacity = inputs['capacity']
+    values = np.asarray(inputs['values'], dtype=np.int64)
+    weights = np.asarray(inputs['weights'], dtype=np.int64)
+    # two value rows, their sum and the shifted row of the current item
+    splitmemory = (capacity + 1) * 8 * 4
+    if splitmemory > memorybudget:
+        raise MemoryError('capacity ' + str(capacity) + ' needs ' + str(splitmemory)
+                          + ' bytes, above the memory budget of ' + str(memorybudget) + ' bytes')
+    deadline = GetDeadline(timelimit)
+    LogInfo('Start solving...')
+    results = [0] * inputs['size']
+    peakmemory = 0
+    subproblems = [(np.arange(inputs['size']), capacity)]
+    while subproblems:
+        items, c = subproblems.pop()
+        tablememory = GetDynamicProgrammingMemory(len(items), c)
+        if tablememory <= memorybudget or len(items) == 1:
+            subinputs = {}
+            subinputs['size'] = len(items)
+            subinputs['capacity'] = c
+            subinputs['values'] = values[items]
+            subinputs['weights'] = weights[items]
+            table = BuildDynamicProgrammingTable(subinputs, deadline)
+            if table is None:
+                return GetGreedyOutputs(inputs, callback)
+            for i, x in zip(items.tolist(), RecoverItems(table, c)):
+                results[i] = x
+            peakmemory = max(peakmemory, tablememory)
+            continue
+        middle = len(items) // 2
+        left, right = items[:middle], items[middle:]
+        leftvalues = GetBestValues(values[left], weights[left], c, deadline)
+        rightvalues = GetBestValues(values[right], weights[right], c, deadline)
+        if leftvalues is None or rightvalues is None:
+            return GetGreedyOutputs(inputs, callback)
+        # best split of the capacity: leftvalues[k] + rightvalues[c - k]
+        split = int(np.argmax(leftvalues + rightvalues[::-1]))
+        peakmemory = max(peakmemory, (c + 1) * 8 * 4)
+        subproblems.append((left, split))
+        subproblems.append((right, c - split))
+    LogInfo('Solver finished.')
+    LogInfo('Peak dynamic programming memory: ' + str(round(peakmemory / 1024**2, 1)) + ' MB'
+            + ' (budget: ' + str(round(memorybudget / 1024**2, 1)) + ' MB)')
+    outputs = {}
+    outputs['objective'] = int(np.dot(values, results))
+    ReportIncumbent(callback, outputs['objective'], results)
+    outputs['variables'] = results
+    outputs['optimal'] = True
+    outputs['peakmemory'] = peakmemory
+    return outputs
+
+# Nemhauser-Ullmann style sparse dynamic programming: only the non-dominated (weight, value) states
+# are kept, as two sorted arrays (increasing weights and strictly increasing values).
+# The states before each item are kept for the traceback.
+# When maxstates is set, the frontier is thinned to at most maxstates evenly spaced states after
+# each item, which turns the engine into a fast heuristic.
+# A MemoryError is raised when the stored states go above the memory budget.
+# When the time limit is reached, the best state over the items seen so far is traced back,
+# and compared to the greedy solution.
+def RunParetoFrontier(inputs, maxstates=None, memorybudget=MEMORY_BUDGET, timelimit=None, callback=None):
+    capacity = inputs['capacity']
+    values = np.asarray(inputs['values'], dtype=np.int64)
+    weights = np.asarray(inputs['weights'], dtype=np.int64)
+    stateweights = np.zeros(1, dtype=np.int64)
+    statevalues = np.zeros(1, dtype=np.int64)
+    frontiers = []
+    nbstates = 0
+    optimal = True
+    deadline = GetDeadline(timelimit)
+    LogInfo('Start solving...')
+    for w, v in zip(weights.tolist(), values.tolist()):
+        if IsExpired(deadline):
+            LogInfo('Time limit reached after ' + str(len(frontiers)) + ' items')
+            optimal = False
+            break
+        frontiers.append((stateweights, statevalues))
+        nbstates += len(stateweights)
+        if nbstates * 16 > memorybudget:
+            raise MemoryError('Pareto states need more than the memory budget of '
+                              + str(memorybudget) + ' bytes')
+        # add the item to every state that can still hold it
+        k = np.searchsorted(stateweights, capacity - w, side='right')
+        mergedweights = np.concatenate((stateweights, stateweights[:k] + w))
+        mergedvalues = np.concatenate((statevalues, statevalues[:k] + v))
+        # sort by increasing weight, then decreasing value, and keep states that beat every lighter state
+        order = np.lexsort((-mergedvalues, mergedweights))
+        mergedweights = mergedweights[order]
+        mergedvalues = mergedvalues[order]
+        keep = np.empty(len(mergedvalues), dtype=bool)
+        keep[0] = True
+        keep[1:] = mergedvalues[1:] > np.maximum.accumulate(mergedvalues)[:-1]
+        stateweights = mergedweights[keep]
+        statevalues = mergedvalues[keep]
+        if maxstates is not None and len(stateweights) > maxstates:
+            optimal = False
+            keep = np.unique(np.linspace(0, len(stateweights) - 1, maxstates).astype(np.int64))
+            stateweights = stateweights[keep]
+            statevalues = statevalues[keep]
+    LogInfo('Solver finished.')
+    LogInfo('Pareto states: ' + str(nbstates) + ' (' + str(round(nbstates * 16 / 1024**2, 1)) + ' MB)')
+
+    # traceback: a state missing from the previous frontier was reached by taking the item
+    results = [0] * inputs['size']
+    w, v = int(stateweights[-1]), int(statevalues[-1])
+    for i in range(len(frontiers) - 1, -1, -1):
+        previousweights, previousvalues = frontiers[i]
+        k = np.searchsorted(previousweights, w)
+        if k < len(previousweights) and previousweights[k] == w and previousvalues[k] == v:
+            continue
+        results[i] = 1
+        w -= int(weights[i])
+        v -= int(values[i])
+
+    objective = int(statevalues[-1])
+    if not optimal:
+        greedyvalue, greedyresults = GetGreedySolution(inputs)
+        if greedyvalue > objective:
+            objective, results = greedyvalue, greedyresults
+    ReportIncumbent(callback, objective, results)
+
+    outputs = {}
+    outputs['objective'] = objective
+    outputs['variables'] = results
+    outputs['optimal'] = optimal
+    return outputs
+
+# sort the items by decreasing value/weight, items without weight first
+def GetDensityOrder(inputs):
+    values = np.asarray(inputs['values'], dtype=np.float64)
+    weights = np.asarray(inputs['weights'], dtype=np.float64)
+    densities = np.full(inputs['size'], np.inf)
+    np.divide(values, weights, out=densities, where=weights > 0)
+    return np.argsort(-densities, kind='stable').tolist()
+
+# greedy solution: take every item that still fits, by decreasing density
+def GetGreedySolution(inputs, order=None):
+    if order is None:
+        order = GetDensityOrder(inputs)
+    values = np.asarray(inputs['values']).tolist()
+    weights = np.asarray(inputs['weights']).tolist()
+    value = 0
+    results = [0] * inputs['size']
+    room = inputs['capacity']
+    for i in order:
+        i = int(i)
+        if weights[i] <= room:
+            results[i] = 1
+            value += values[i]
+            room -= weights[i]
+    return value, results
+
+# outputs of an engine that ran out of time before having its own solution
+def GetGreedyOutputs(inputs, callback=None):
+    LogInfo('Time limit reached, returning the greedy solution')
+    value, results = GetGreedySolution(inputs)
+    ReportIncumbent(callback, value, results)
+    outputs = {}
+    outputs['objective'] = value
+    outputs['variables'] = results
+    outputs['optimal'] = False
+    return outputs
+
+# depth-first branch and bound on the items sorted by density.
+# The Dantzig (LP relaxation) bound of a node is computed from prefix sums of the sorted
+# weights and values, with a binary search for the critical item that only fits fractionally.
+# Nodes are pruned against the incumbent, initialized with the greedy solution.
+# The search stops after maxnodes nodes or timelimit seconds, returning the incumbent;
+# the solution is flagged as optimal only if the whole tree was explored.
+def RunBranchAndBound(inputs, maxnodes=None, timelimit=None, callback=None):
+    capacity = inputs['capacity']
+    order = GetDensityOrder(inputs)
+    values = np.asarray(inputs['values'], dtype=np.int64)[order].tolist()
+    weights = np.asarray(inputs['weights'], dtype=np.int64)[order].tolist()
+    size = len(order)
+    prefixweights = [0] * (size + 1)
+    prefixvalues = [0] * (size + 1)
+    for k in range(size):
+        prefixweights[k + 1] = prefixweights[k] + weights[k]
+        prefixvalues[k + 1] = prefixvalues[k] + values[k]
+
+    # map a solution on the sorted items back to the original items
+    def Unsort(sortedresults):
+        results = [0] * size
+        for k, i in enumerate(order):
+            results[i] = sortedresults[k]
+        return results
+
+    # greedy incumbent, mapped on the sorted items
+    bestvalue, greedyresults = GetGreedySolution(inputs, order)
+    bestresults = [greedyresults[i] for i in order]
+    LogInfo('Greedy incumbent: ' + str(bestvalue))
+    ReportIncumbent(callback, bestvalue, greedyresults)
+
+    LogInfo('Start solving...')
+    deadline = GetDeadline(timelimit)
+    results = [0] * size
+    nodes = 0
+    optimal = True
+    # each node is (next item, remaining capacity, value, decision taken on the previous item)
+    stack = [(0, capacity, 0, 0)]
+    while stack:
+        k, room, value, decision = stack.pop()
+        if k > 0:
+            results[k - 1] = decision
+        nodes += 1
+        if maxnodes is not None and nodes > maxnodes:
+            optimal = False
+            break
+        if nodes % 1024 == 0 and IsExpired(deadline):
+            optimal = False
+            break
+        # items k..j-1 fit entirely, item j is the critical item
+        j = bisect_right(prefixweights, prefixweights[k] + room) - 1
+        bound = value + prefixvalues[j] - prefixvalues[k]
+        if j == size:
+            # all the remaining items fit: the bound is reached
+            if bound > bestvalue:
+                bestvalue = bound
+                bestresults = results[:k] + [1] * (size - k)
+                if callback is not None:
+                    ReportIncumbent(callback, bestvalue, Unsort(bestresults))
+            continue
+        if bound + (prefixweights[k] + room - prefixweights[j]) * values[j] // weights[j] <= bestvalue:
+            continue
+        # explore the branch without item k last
+        stack.append((k + 1, room, value, 0))
+        if weights[k] <= room:
+            stack.append((k + 1, room - weights[k], value + values[k], 1))
+    LogInfo('Solver finished after ' + str(nodes) + ' nodes.')
+
+    outputs = {}
+    outputs['objective'] = bestvalue
+    outputs['variables'] = Unsort(bestresults)
+    outputs['optimal'] = optimal
+    outputs['nodes'] = nodes
+    return outputs
+
+def RunDynamicProgramming(inputs, memorybudget=MEMORY_BUDGET, timelimit=None, callback=None):
+    memory = GetDynamicProgrammingMemory(inputs['size'], inputs['capacity'])
+    if memory > memorybudget:
+        raise MemoryError('dynamic programming needs ' + str(memory) + ' bytes, above the memory budget of '
+                          + str(memorybudget) + ' bytes')
+    LogInfo('Dynamic programming memory: ' + str(round(memory / 1024**2, 1)) + ' MB')
+    LogInfo('Start solving...')
+    table = BuildDynamicProgrammingTable(inputs, GetDeadline(timelimit))
+    if table is None:
+        return GetGreedyOutputs(inputs, callback)
+    LogInfo('Solver finished.')
+    outputs = {}
+    outputs['objective'] = int(table['bestvalues'][inputs['capacity']])
+    outputs['variables'] = RecoverItems(table, inputs['capacity'])
+    outputs['optimal'] = True
+    ReportIncumbent(callback, outputs['objective'], outputs['variables'])
+    return outputs
+
+# parametric capacity sweep: a single dynamic programming pass gives the optimal value for every
+# capacity from 0 to capacity (the instance capacity by default).
+# profile['bestvalues'] is the NumPy array of these values, and the items of any capacity
+# c <= capacity are recovered on demand with RecoverItems(profile, c).
+# example: profile = GetCapacityProfile(GetInputs(input_data), 5000)
+def GetCapacityProfile(inputs, capacity=None, memorybudget=MEMORY_BUDGET):
+    profileinputs = dict(inputs)
+    if capacity is not None:
+        profileinputs['capacity'] = capacity
+    memory = GetDynamicProgrammingMemory(inputs['size'], profileinputs['capacity'])
+    if memory > memorybudget:
+        raise MemoryError('capacity profile needs ' + str(memory) + ' bytes, above the memory budget of '
+                          + str(memorybudget) + ' bytes')
+    LogInfo('Capacity profile memory: ' + str(round(memory / 1024**2, 1)) + ' MB')
+    return BuildDynamicProgrammingTable(profileinputs)
+
+# dense dynamic programming is only used up to this number of (item, capacity) cells
+DENSE_DP_CELLS = 10**9
+# node budget of the branch and bound tried before the Pareto frontier
+AUTO_BNB_NODES = 1000000
+
+# pick an engine from the instance size:
+# - dense dynamic programming when the table is small enough,
+# - otherwise the branch and bound, kept if it proves optimality within AUTO_BNB_NODES nodes,
+# - then the Pareto frontier, falling back to the divide-and-conquer DP when the frontier
+#   does not fit in memory, and to the MIP (exact) when neither does.
+# With maxstates, the last fallback is instead a Pareto frontier capped at maxstates states
+# (a heuristic, faster on huge instances).
+def RunAutomatically(inputs, memorybudget=MEMORY_BUDGET, timelimit=None, callback=None, maxstates=None):
+    deadline = GetDeadline(timelimit)
+    cells = inputs['size'] * (inputs['capacity'] + 1)
+    if cells <= DENSE_DP_CELLS and GetDynamicProgrammingMemory(inputs['size'], inputs['capacity']) <= memorybudget:
+        LogInfo('Selected method: dp')
+        return RunDynamicProgramming(inputs, memorybudget, timelimit, callback)
+    LogInfo('Selected method: bnb with at most ' + str(AUTO_BNB_NODES) + ' nodes')
+    outputs = RunBranchAndBound(inputs, AUTO_BNB_NODES, GetRemainingTime(deadline), callback)
+    if outputs['optimal'] or IsExpired(deadline):
+        return outputs
+    LogInfo('Selected method: pareto')
+    try:
+        return RunParetoFrontier(inputs, None, memorybudget, GetRemainingTime(deadline), callback)
+    except MemoryError as e:
+        LogInfo(str(e))
+    if (inputs['capacity'] + 1) * 8 * 4 <= memorybudget:
+        LogInfo('Selected method: dpsplit')
+        return RunDivideAndConquerDP(inputs, memorybudget, GetRemainingTime(deadline), callback)
+    if maxstates is not None:
+        LogInfo('Selected method: pareto with at most ' + str(maxstates) + ' states')
+        return RunParetoFrontier(inputs, maxstates, memorybudget, GetRemainingTime(deadline), callback)
+    LogInfo('Selected method: mip')
+    return RunORToolsMIP(inputs, timelimit=GetRemainingTime(deadline), callback=callback)
+
+# initial number of items kept on each side of the break item by the core reduction
+CORE_SIZE = 25
+# share of the remaining time given to each core solve, the rest is kept for the expansions
+CORE_TIME_SHARE = 0.5
+
+# LP relaxation (Dantzig bound) of the instance: items are taken by decreasing density until the
+# break item, which only fits fractionally.
+def GetLPRelaxation(inputs, order=None):
+    if order is None:
+        order = GetDensityOrder(inputs)
+    lp = {}
+    lp['order'] = np.asarray(order, dtype=np.int64)
+    lp['capacity'] = inputs['capacity']
+    lp['values'] = np.asarray(inputs['values'], dtype=np.int64)[lp['order']]
+    lp['weights'] = np.asarray(inputs['weights'], dtype=np.int64)[lp['order']]
+    lp['prefixweights'] = np.concatenate(([0], np.cumsum(lp['weights'])))
+    lp['prefixvalues'] = np.concatenate(([0], np.cumsum(lp['values'])))
+    # items before the break item fit entirely
+    lp['break'] = int(np.searchsorted(lp['prefixweights'], inputs['capacity'], side='right')) - 1
+    lp['bound'] = int(GetDantzigBounds(lp, np.array([inputs['capacity']]))[0])
+    return lp
+
+# Dantzig bounds (rounded down) of the instance for an array of capacities
+def GetDantzigBounds(lp, capacities):
+    k = np.searchsorted(lp['prefixweights'], capacities, side='right') - 1
+    bounds = lp['prefixvalues'][k]
+    fractional = k < len(lp['values'])
+    k = k[fractional]
+    bounds[fractional] += (capacities[fractional] - lp['prefixweights'][k]) * lp['values'][k] // lp['weights'][k]
+    return bounds
+
+# upper bound of the solutions where each item takes the opposite of its LP value, i.e. the
+# LP relaxation with the item fixed, which is at most the LP bound minus the item's reduced cost:
+# - an item before the break item is left out: the others fill capacity + weight of the item,
+# - an item after the break item is taken: the others fill capacity - weight of the item.
+# The break item itself can never be fixed.
+def GetFlipBounds(lp):
+    size = len(lp['values'])
+    breakitem = lp['break']
+    capacity = lp['capacity']
+    values = lp['values']
+    weights = lp['weights']
+    bounds = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+    bounds[:breakitem] = GetDantzigBounds(lp, capacity + weights[:breakitem]) - values[:breakitem]
+    after = np.arange(breakitem + 1, size)
+    after = after[weights[after] <= capacity]
+    bounds[breakitem + 1:] = -1
+    bounds[after] = values[after] + GetDantzigBounds(lp, capacity - weights[after])
+    flipbounds = np.empty(size, dtype=np.int64)
+    flipbounds[lp['order']] = bounds
+    return flipbounds
+
+# build the sub-instance restricted to the given items
+def GetSubInputs(inputs, items, capacity):
+    subinputs = {}
+    subinputs['size'] = len(items)
+    subinputs['capacity'] = int(capacity)
+    subinputs['values'] = np.asarray(inputs['values'], dtype=np.int64)[items]
+    subinputs['weights'] = np.asarray(inputs['weights'], dtype=np.int64)[items]
+    return subinputs
+
+# full solution from the fixed items and the solution of the core
+def MergeCoreOutputs(size, fixed, fixedvalue, core, coreoutputs):
+    outputs = {}
+    outputs['objective'] = fixedvalue + coreoutputs['objective']
+    outputs['variables'] = [0] * size
+    for i in fixed:
+        outputs['variables'][i] = 1
+    for i, x in zip(core, coreoutputs['variables']):
+        outputs['variables'][i] = x
+    return outputs
+
+# core problem reduction: items before the break item (in density order) are fixed in the
+# knapsack, items after it are left out, and only the core of 2 * coresize + 1 items around the
+# break item is solved with the given engine.
+# The fixing is then checked with the LP bound of each item flipped: the items that could still
+# improve the solution are added to the core, the window around the break item is doubled,
+# and the core is solved again, until the check passes or the time limit is reached.
+# Each core solve gets CORE_TIME_SHARE of the remaining time, and the whole remaining time once
+# the core holds every item.
+def RunCoreReduction(inputs, engine, coresize=CORE_SIZE, timelimit=None, callback=None, **options):
+    lp = GetLPRelaxation(inputs)
+    order = lp['order']
+    breakitem = lp['break']
+    size = inputs['size']
+    deadline = GetDeadline(timelimit)
+    LogInfo('Break item: ' + str(breakitem) + ' in density order')
+    # core items and flip bounds, by position in the density order
+    incore = np.zeros(size, dtype=bool)
+    flipbounds = GetFlipBounds(lp)[order]
+    # the greedy solution is the first incumbent
+    best = {}
+    best['objective'], best['variables'] = GetGreedySolution(inputs, order)
+    best['optimal'] = False
+    ReportIncumbent(callback, best['objective'], best['variables'])
+    LogInfo('LP bound: ' + str(lp['bound']) + ', greedy incumbent: ' + str(best['objective'])
+            + ', gap: ' + str(lp['bound'] - best['objective']))
+    while True:
+        incore[max(0, breakitem - coresize):breakitem + coresize + 1] = True
+        core = order[incore].tolist()
+        fixed = order[:breakitem][~incore[:breakitem]].tolist()
+        fixedweight = int(np.asarray(inputs['weights'], dtype=np.int64)[fixed].sum())
+        fixedvalue = int(np.asarray(inputs['values'], dtype=np.int64)[fixed].sum())
+
+        # only report the core solutions that improve the best full solution
+        def ReportCoreIncumbent(coreoutputs):
+            outputs = MergeCoreOutputs(size, fixed, fixedvalue, core, coreoutputs)
+            if outputs['objective'] > best['objective']:
+                callback(outputs)
+
+        coretimelimit = GetRemainingTime(deadline)
+        shared = coretimelimit is not None and len(core) < size
+        if shared:
+            coretimelimit *= CORE_TIME_SHARE
+        LogInfo('Solving core of ' + str(len(core)) + ' items out of ' + str(size))
+        coreoutputs = engine(GetSubInputs(inputs, core, inputs['capacity'] - fixedweight),
+                             timelimit=coretimelimit,
+                             callback=ReportCoreIncumbent if callback is not None else None,
+                             **options)
+        outputs = MergeCoreOutputs(size, fixed, fixedvalue, core, coreoutputs)
+        unfixable = (flipbounds > outputs['objective']) & ~incore
+        outputs['optimal'] = coreoutputs['optimal'] and not unfixable.any()
+        if outputs['objective'] > best['objective'] or outputs['optimal']:
+            best = outputs
+        # a core solve cut by its share of the time is retried on a larger core
+        if not unfixable.any() and (coreoutputs['optimal'] or not shared):
+            break
+        if IsExpired(deadline):
+            LogInfo('Time limit reached with ' + str(len(core)) + ' core items')
+            break
+        if unfixable.any():
+            LogInfo(str(np.count_nonzero(unfixable)) + ' fixed items could improve the objective '
+                    + str(outputs['objective']) + ', expanding core')
+        else:
+            LogInfo('Core solve stopped at its share of the time, expanding core')
+        incore |= unfixable
+        coresize *= 2
+    return best
+
+# instance normalization: items heavier than the capacity are dropped, the capacity is clamped
+# to the total weight of the remaining items, and weights and capacity are divided by the gcd
+# of the weights. Returns the normalized inputs and the original index of each kept item.
+# The arrays are only copied when items are dropped or weights divided.
+def NormalizeInputs(inputs):
+    values = np.asarray(inputs['values'], dtype=np.int64)
+    weights = np.asarray(inputs['weights'], dtype=np.int64)
+    items = np.flatnonzero(weights <= inputs['capacity'])
+    if len(items) < inputs['size']:
+        values = values[items]
+        weights = weights[items]
+    capacity = min(int(inputs['capacity']), int(weights.sum()))
+    divisor = max(int(np.gcd.reduce(weights)) if len(weights) else 1, 1)
+    normalized = {}
+    normalized['size'] = len(items)
+    normalized['capacity'] = capacity // divisor
+    normalized['values'] = values
+    normalized['weights'] = weights // divisor if divisor > 1 else weights
+    LogInfo('Normalization: ' + str(inputs['size'] - len(items)) + ' items dropped, weight gcd ' + str(divisor)
+            + ', capacity ' + str(inputs['capacity']) + ' -> ' + str(normalized['capacity']))
+    return normalized, items.tolist()
+
+# map the outputs of a normalized instance back to the original items
+def DenormalizeOutputs(outputs, items, size):
+    variables = [0] * size
+    for i, x in zip(items, outputs['variables']):
+        variables[i] = x
+    outputs = dict(outputs)
+    outputs['variables'] = variables
+    return outputs
+
+# available engines, selected with the 'method' argument of solve_it
+ENGINES = {
+    'mip': RunORToolsMIP,
+    'binpacking': RunORToolsBinPacking,
+    'dp': RunDynamicProgramming,
+    'dpsplit': RunDivideAndConquerDP,
+    'pareto': RunParetoFrontier,
+    'bnb': RunBranchAndBound,
+    'auto': RunAutomatically,
+}
+
+# engines of the extended instances (several dimensions or knapsacks)
+MULTI_ENGINES = {
+    'mip': RunORToolsMultiMIP,
+    'binpacking': RunORToolsBinPacking,
+    'auto': RunORToolsMultiMIP,
+}
+
+# engines raced by the portfolio
+PORTFOLIO_METHODS = ['mip', 'binpacking', 'bnb', 'auto']
+# extra time given to the engines to return their final solution after the time limit
+PORTFOLIO_GRACE = 1.0
+# interval (in seconds) at which the portfolio checks that the engine processes are still alive
+PORTFOLIO_POLL = 0.5
+
+# runs one engine of the portfolio and sends its incumbents and final solution to the queue
+def RunPortfolioEngine(method, inputs, core, timelimit, queue):
+    global VERBOSE
+    VERBOSE = False
+    callback = lambda outputs: queue.put((method, 'incumbent', outputs))
+    try:
+        if core:
+            outputs = RunCoreReduction(inputs, ENGINES[method], timelimit=timelimit, callback=callback)
+        else:
+            outputs = ENGINES[method](inputs, timelimit=timelimit, callback=callback)
+        queue.put((method, 'final', outputs))
+    except Exception as e:
+        queue.put((method, 'error', repr(e)))
+
+# portfolio: the engines race in separate processes. The first proven optimal solution wins;
+# otherwise the best incumbent when the time limit is reached (or when all the engines are done).
+# The remaining engines are then killed. When logfile is given, the winner is appended to that
+# csv file, e.g. solve_it(input_data, 'portfolio', logfile='portfolio.csv').
+def RunPortfolio(inputs, methods=PORTFOLIO_METHODS, core=True, timelimit=None, callback=None,
+                 logfile=None, name=None):
+    import multiprocessing
+    try:
+        from queue import Empty
+    except ImportError:
+        from Queue import Empty
+    if name is None:
+        name = str(inputs['size']) + '_' + str(inputs['capacity'])
+    start = time.time()
+    deadline = GetDeadline(timelimit + PORTFOLIO_GRACE if timelimit is not None else None)
+    queue = multiprocessing.Queue()
+    processes = []
+    for method in methods:
+        process = multiprocessing.Process(target=RunPortfolioEngine, args=(method, inputs, core, timelimit, queue))
+        process.daemon = True
+        process.start()
+        processes.append(process)
+    LogInfo('Portfolio started: ' + ', '.join(methods))
+
+    best = None
+    winner = None
+    finished = set()
+    while len(finished) < len(methods):
+        remaining = GetRemainingTime(deadline)
+        try:
+            method, kind, payload = queue.get(timeout=min(remaining, PORTFOLIO_POLL) if remaining is not None else PORTFOLIO_POLL)
+        except Empty:
+            if IsExpired(deadline):
+                LogInfo('Portfolio time limit reached')
+                break
+            # engines that died without sending their final solution (e.g. killed or crashed)
+            for method, process in zip(methods, processes):
+                if method not in finished and not process.is_alive():
+                    LogInfo('Engine ' + method + ' died (exit code ' + str(process.exitcode) + ')')
+                    finished.add(method)
+            continue
+        if kind == 'error':
+            LogInfo('Engine ' + method + ' failed: ' + payload)
+            finished.add(method)
+            continue
+        if kind == 'final':
+            finished.add(method)
+            LogInfo('Engine ' + method + ' finished: ' + str(payload['objective'])
+                    + (' (optimal)' if payload['optimal'] else ''))
+        if best is None or payload['objective'] > best['objective'] or (kind == 'final' and payload['optimal']):
+            if best is None or payload['objective'] > best['objective']:
+                ReportIncumbent(callback, payload['objective'], payload['variables'])
+            best = dict(payload)
+            best['optimal'] = kind == 'final' and payload['optimal']
+            winner = method
+        if best['optimal']:
+            break
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    if best is None:
+        raise RuntimeError('no engine of the portfolio returned a solution')
+    elapsed = time.time() - start
+    LogInfo('Portfolio winner: ' + winner + ' (' + str(best['objective']) + ', ' + str(round(elapsed, 2)) + 's)')
+
+    if logfile is not None:
+        newfile = not os.path.isfile(logfile)
+        with open(logfile, 'a') as log:
+            if newfile:
+                log.write('date,instance,size,capacity,winner,objective,optimal,seconds\n')
+            log.write(','.join([datetime.now().strftime('%Y-%m-%d %H:%M:%S'), name, str(inputs['size']),
+                                str(inputs['capacity']), winner, str(best['objective']),
+                                str(int(best['optimal'])), str(round(elapsed, 3))]) + '\n')
+    return best
+
+# extra keyword options are forwarded to the selected engine, e.g. memorybudget for 'dpsplit'.
+# Engines run on the normalized instance (see NormalizeInputs).
+# With core=True, the engine only solves the core problem around the break item.
+# method='portfolio' races several engines in parallel processes (see RunPortfolio).
+# Every engine accepts a timelimit (in seconds), after which the best solution found so far is
+# returned and only flagged as optimal if optimality was proven, and a callback called with
+# each improving solution (an outputs dict with 'objective' and 'variables').
+def solve_it(input_data, method='auto', core=True, callback=None, **options):
+    return SolveInputs(GetInputArrays(input_data), method, core, callback, **options)
+
+# same as solve_it, on parsed inputs.
+# Extended instances skip the normalization and the core reduction, and only run the
+# MULTI_ENGINES; their variables are knapsack numbers (0 for the items left out).
+def SolveInputs(inputs, method='auto', core=True, callback=None, **options):
+    if IsMultiKnapsack(inputs):
+        if method not in MULTI_ENGINES:
+            raise ValueError('method ' + method + ' does not support several dimensions or knapsacks')
+        outputs = MULTI_ENGINES[method](inputs, callback=callback, **options)
+    else:
+        normalized, items = NormalizeInputs(inputs)
+        if callback is not None:
+            options['callback'] = lambda outputs: callback(DenormalizeOutputs(outputs, items, inputs['size']))
+        if method == 'portfolio':
+            outputs = RunPortfolio(normalized, core=core, **options)
+        elif core:
+            outputs = RunCoreReduction(normalized, ENGINES[method], **options)
+        else:
+            outputs = ENGINES[method](normalized, **options)
+        outputs = DenormalizeOutputs(outputs, items, inputs['size'])
     # Return
-    results = str(outputs['objective']) + ' 1\n' + ' '.join(map(str, outputs['variables'])) 
-    print('****************************************************')
-    print(results)
+    results = str(outputs['objective']) + ' ' + str(int(outputs['optimal'])) + '\n' + ' '.join(map(str, outputs['variables']))
+    if VERBOSE:
+        print('Objective value =', outputs['objective'])
+        print('****************************************************')
+        print(results)
     return results
 
-def solve_it(input_data):
-    #results = SolveWithORToolsMIP(input_data)
-    results = SolveWithORToolsBinPacking(input_data)
+# batch workers stay alive between instances and don't print anything
+def InitBatchWorker():
+    global VERBOSE
+    VERBOSE = False
+
+def SolveBatchInstance(task):
+    instance, method, options = task
+    if os.path.isfile(instance):
+        return SolveInputs(ReadInputArrays(instance), method, **options)
+    return solve_it(instance, method, **options)
+
+# solve many instances (input strings or file locations) over a pool of worker processes.
+# The results are returned in the order of the instances.
+# example: solve_batch(glob.glob('./data/ks_*'), workers=4)
+def solve_batch(instances, method='auto', workers=None, chunksize=None, **options):
+    from concurrent.futures import ProcessPoolExecutor
+    instances = list(instances)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # a few chunks per worker to amortize the inter-process communication
+        chunksize = max(1, len(instances) // (workers * 4))
+    LogInfo('Solving ' + str(len(instances)) + ' instances with ' + str(workers) + ' workers...')
+    start = time.time()
+    tasks = [(instance, method, options) for instance in instances]
+    with ProcessPoolExecutor(max_workers=workers, initializer=InitBatchWorker) as executor:
+        results = list(executor.map(SolveBatchInstance, tasks, chunksize=chunksize))
+    elapsed = time.time() - start
+    LogInfo('Solved ' + str(len(instances)) + ' instances in ' + str(round(elapsed, 2)) + 's ('
+            + str(round(len(instances) / max(elapsed, 1e-9), 1)) + ' instances/s)')
     return results
     
 if __name__ == '__main__':
@@ -105,6 +1015,10 @@ if __name__ == '__main__':
         file_location = sys.argv[1].strip()
         with open(file_location, 'r') as input_data_file:
             input_data = input_data_file.read()
-        solve_it(input_data)
+        method = sys.argv[2].strip() if len(sys.argv) > 2 else 'auto'
+        if method == 'portfolio':
+            solve_it(input_data, method, name=os.path.basename(file_location))
+        else:
+            solve_it(input_data, method)
     else:
         print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/ks_4_0)')
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
+import os
+import time
+import heapq
+import numpy as np
 
 def LogInfo(msg):
     print(datetime.now().strftime('%H:%M:%S') + ' - ' + msg)
@@ -11,125 +15,446 @@ def ReadFile(file_location):
         input_data = input_data_file.read()
     return input_data
 
+# the graph is parsed with NumPy: duplicated and reversed edges are removed with np.unique on the edge keys,
+# and the adjacency is stored in several forms:
+# - 'indptr' and 'indices': CSR arrays, the sorted neighbors of node i are indices[indptr[i]:indptr[i+1]]
+# - 'degrees': number of neighbors of each node
+# - 'neighbors': one bitset (python int) per node, bit j is set if the nodes are adjacent
+# - 'adjacentnodes': the sorted neighbors of each node, as python lists
+# - 'startnodes' and 'endnodes': the unique edges, with startnode < endnode
 def GetInputs(input_data):
-    input_data = input_data.splitlines()
-    input_data = [list(map(int, x.split(' ')))  for x in input_data]
+    numbers = np.fromstring(input_data, dtype=np.int64, sep=' ')
+    nbnodes = int(numbers[0])
+    edges = numbers[2:2 + 2 * int(numbers[1])].reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    keys = np.unique(edges.min(axis=1) * nbnodes + edges.max(axis=1))
+    edges = np.stack([keys // nbnodes, keys % nbnodes], axis=1)
+    LogInfo('nbnodes=' + str(nbnodes) + '; nbedges=' + str(len(edges)))
+    return GetGraphInputs(nbnodes, edges)
+
+# inputs of a graph given by its unique edges (see GetInputs).
+# adjacency may give the CSR arrays and degrees already computed (e.g. from the cache).
+def GetGraphInputs(nbnodes, edges, adjacency=None):
     inputs={}
-    inputs['nbnodes'] = input_data[0][0]
-    inputs['nbedges'] = input_data[0][1]
-    LogInfo('nbnodes=' + str(inputs['nbnodes']) + '; nbedges=' + str(inputs['nbedges']))
-    inputs['startnodes'] = [row[0] for row in input_data[1:]]
-    inputs['endnodes'] = [row[1] for row in input_data[1:]]
-    adjacentnodes = {}
-    for row in input_data[1:]:
-        node1 = row[0]
-        node2 = row[1]
-        if node1 not in adjacentnodes:
-            adjacentnodes[node1] = []
-        if node2 not in adjacentnodes[node1]:
-            adjacentnodes[node1].append(node2)
-        if node2 not in adjacentnodes:
-            adjacentnodes[node2] = []
-        if node1 not in adjacentnodes[node2]:
-            adjacentnodes[node2].append(node1)
-    for k, v in adjacentnodes.items():
-        v.sort()
-    inputs['nodes'] = list(adjacentnodes.keys())
+    inputs['nbnodes'] = nbnodes
+    inputs['nbedges'] = len(edges)
+    inputs['startnodes'] = edges[:, 0].tolist()
+    inputs['endnodes'] = edges[:, 1].tolist()
+    if adjacency is None:
+        adjacency = GetAdjacency(nbnodes, edges)
+    inputs.update(adjacency)
+    inputs.update(GetNeighborLists(nbnodes, inputs['indptr'], inputs['indices']))
+    inputs['nodes'] = list(range(inputs['nbnodes']))
     inputs['colors'] = range(len(inputs['nodes'])) # initialize colors to one for each node
-    inputs['adjacentnodes'] = adjacentnodes
     return inputs
 
-# function to get the lower bounds of possible colors
-# example: GetGraphColoringLowerBound(GetInputs(ReadFile('data/a_4')), 0)
-def GetGraphColoringLowerBound(inputs, node):
-    neighbors = inputs['adjacentnodes'][node]
-    # print('neighbors of ', node, ': ',neighbors)
-    neighborsColors = {}
-    minColors = 0
-    for n in neighbors:
-        neighborsneighbors = inputs['adjacentnodes'][n]
-        commonneighbors = 0
-        for nn in neighborsneighbors:
-            if nn != node: 
-                if nn in neighbors:
-                    commonneighbors += 1
-                if commonneighbors > minColors:
-                    minColors = commonneighbors
-    return minColors + 1
-
-# function to run the algorithm for a given, ordered, list of nodes 
-def RunGreedyAlgorithm(inputs):
-    LogInfo('Start greedy algo...')
-    nodecolors = {}
+# CSR arrays and degrees of a graph given by its unique edges
+def GetAdjacency(nbnodes, edges):
+    sources = np.concatenate([edges[:, 0], edges[:, 1]])
+    targets = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(sources * nbnodes + targets)
+    adjacency = {}
+    adjacency['degrees'] = np.bincount(sources, minlength=nbnodes)
+    adjacency['indptr'] = np.concatenate([[0], np.cumsum(adjacency['degrees'])])
+    adjacency['indices'] = targets[order]
+    return adjacency
 
-    inputNodes = inputs['nodes']
-    
-    # sort nodes based on their number of neighbors.
-    # nodes with more neighbors will have priority during color assignment
-    LogInfo('Sorting nodes...')
-    sortedNodesDict = {}
-    maxneighbors = 0
-    for k, v in inputs['adjacentnodes'].items():
-        nbneighbors = len(v)
-        sortedNodesDict[k] = nbneighbors
-    sortedNodesDict = sorted(sortedNodesDict.items(), key=lambda x: x[1])
-    sortedNodes = []
-    for n in sortedNodesDict:
-        sortedNodes.append(n[0])
-    sortedNodes = sortedNodes[::-1]
-    inputNodes = sortedNodes
+# neighbor lists and bitsets of each node, from the CSR arrays
+def GetNeighborLists(nbnodes, indptr, indices):
+    rows = np.split(np.asarray(indices), np.asarray(indptr)[1:-1])
+    lists = {}
+    lists['adjacentnodes'] = [row.tolist() for row in rows]
+    # bitsets: the bits of each row are set in a little-endian byte array, converted to an int
+    neighbors = []
+    bits = np.zeros((nbnodes + 7) // 8, dtype=np.uint8)
+    for adjacentNodes in rows:
+        bits[:] = 0
+        np.bitwise_or.at(bits, adjacentNodes >> 3, (1 << (adjacentNodes & 7)).astype(np.uint8))
+        neighbors.append(int.from_bytes(bits.tobytes(), 'little'))
+    lists['neighbors'] = neighbors
+    return lists
+
+# binary cache of the parsed instances: an uncompressed .npz next to the instance file, with the
+# unique edges, the CSR arrays, the degrees and the clique lower bound (see GetMaxClique), and the
+# sha1 of the instance file, so that the cache is rebuilt when the instance changes.
+# The arrays are memory-mapped from the .npz when loaded (see LoadNpz), which skips the parsing,
+# the edge deduplication and the clique search. The neighbor lists and bitsets are python objects
+# and are still rebuilt from the CSR arrays on each load (about 0.2s on gc_1000_9).
+CACHE_EXTENSION = '.npz'
+
+# inputs of an instance file, from the cache when it is up to date, otherwise parsed and cached
+# example: inputs = ReadInputs('data/gc_1000_5')
+def ReadInputs(file_location, cache=True):
+    import hashlib
+    with open(file_location, 'rb') as input_data_file:
+        input_data = input_data_file.read()
+    digest = np.frombuffer(hashlib.sha1(input_data).digest(), dtype=np.uint8)
+    cachefile = file_location + CACHE_EXTENSION
+    arrays = None
+    if cache and os.path.isfile(cachefile):
+        try:
+            arrays = LoadNpz(cachefile)
+            if np.array_equal(arrays['hash'], digest):
+                adjacency = dict((name, arrays[name]) for name in ('indptr', 'indices', 'degrees'))
+                inputs = GetGraphInputs(int(arrays['nbnodes'][0]), arrays['edges'], adjacency)
+                inputs['clique'] = arrays['clique'].tolist()
+                LogInfo('nbnodes=' + str(inputs['nbnodes']) + '; nbedges=' + str(inputs['nbedges']) + ' (cached)')
+                return inputs
+            LogInfo('Cache out of date: ' + cachefile)
+        except (ValueError, KeyError, OSError) as e:
+            LogInfo('Cache ignored: ' + repr(e))
+    # release the memory maps of the old cache before replacing it (the replace fails on Windows
+    # while the file is mapped)
+    arrays = None
+    inputs = GetInputs(input_data.decode())
+    if cache:
+        inputs['clique'] = GetMaxClique(inputs, exact=True)
+        edges = np.stack([inputs['startnodes'], inputs['endnodes']], axis=1).reshape(-1, 2).astype(np.int64)
+        temporaryfile = cachefile + '.tmp' + CACHE_EXTENSION
+        try:
+            np.savez(temporaryfile, hash=digest, nbnodes=np.array([inputs['nbnodes']], dtype=np.int64), edges=edges,
+                     indptr=inputs['indptr'].astype(np.int64), indices=inputs['indices'].astype(np.int64),
+                     degrees=inputs['degrees'].astype(np.int64), clique=np.array(inputs['clique'], dtype=np.int64))
+            os.replace(temporaryfile, cachefile)
+        except OSError as e:
+            LogInfo('Cache not written: ' + repr(e))
+    return inputs
+
+# memory-maps the arrays of an uncompressed .npz: each member of the zip archive is a .npy file,
+# whose data starts after the local zip header and the npy header
+def LoadNpz(file_location):
+    import zipfile
+    import struct
+    arrays = {}
+    with zipfile.ZipFile(file_location) as archive:
+        members = archive.infolist()
+    with open(file_location, 'rb') as npz:
+        for member in members:
+            if member.compress_type != zipfile.ZIP_STORED:
+                raise ValueError('compressed member ' + member.filename)
+            npz.seek(member.header_offset)
+            header = npz.read(30)
+            namelength, extralength = struct.unpack('<HH', header[26:30])
+            npz.seek(member.header_offset + 30 + namelength + extralength)
+            version = np.lib.format.read_magic(npz)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(npz)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(npz)
+            name = member.filename[:-len('.npy')]
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(file_location, dtype=dtype, mode='r', offset=npz.tell(), shape=shape,
+                                         order='F' if fortran else 'C')
+    return arrays
+
+# number of bits set in a bitset
+def PopCount(mask):
+    return bin(mask).count('1')
+
+# default budget of the exact clique search (number of expanded nodes)
+CLIQUE_MAXNODES = 10000
+
+# maximum clique, the size of which is a lower bound on the number of colors.
+# A greedy clique is built from each node (adding the nodes by decreasing degree when they are
+# adjacent to the whole clique). With exact=True, it is then improved by a branch and bound
+# (Tomita's MCQ) on the bitsets: the candidates are greedily colored into independent sets,
+# and a branch is cut when the clique plus the number of colors cannot beat the best clique.
+# The exact search stops after maxnodes expansions or timelimit seconds.
+# example: len(GetMaxClique(GetInputs(ReadFile('data/gc_50_3')), exact=True))
+def GetMaxClique(inputs, exact=False, maxnodes=CLIQUE_MAXNODES, timelimit=None):
+    # the cached clique (see ReadInputs) is the result of the exact search with the default budget
+    if 'clique' in inputs and (not exact or (maxnodes is not None and maxnodes <= CLIQUE_MAXNODES)):
+        return list(inputs['clique'])
+    neighbors = inputs['neighbors']
+    degrees = inputs['degrees'].tolist()
+    order = np.argsort(inputs['degrees'], kind='stable')[::-1].tolist()
+    best = []
+    for start in order:
+        if degrees[start] < len(best):
+            break
+        clique = [start]
+        candidates = neighbors[start]
+        for node in order:
+            if not candidates:
+                break
+            if candidates >> node & 1:
+                clique.append(node)
+                candidates &= neighbors[node]
+        if len(clique) > len(best):
+            best = clique
+    if not exact:
+        return best
+
+    deadline = time.time() + timelimit if timelimit is not None else None
+    state = {'best': best, 'nodes': 0, 'complete': True}
+
+    def Expand(clique, candidates):
+        state['nodes'] += 1
+        if (maxnodes is not None and state['nodes'] > maxnodes) or (deadline is not None and time.time() > deadline):
+            state['complete'] = False
+            return
+        # greedy coloring of the candidates: the nodes of a color class are pairwise non adjacent
+        colored = []
+        uncolored = candidates
+        color = 0
+        while uncolored:
+            color += 1
+            colorclass = uncolored
+            while colorclass:
+                node = (colorclass & -colorclass).bit_length() - 1
+                colorclass &= ~neighbors[node] & ~(1 << node)
+                uncolored &= ~(1 << node)
+                colored.append((node, color))
+        # the nodes with the highest colors first
+        for node, color in reversed(colored):
+            if len(clique) + color <= len(state['best']) or not state['complete']:
+                return
+            clique.append(node)
+            newcandidates = candidates & neighbors[node]
+            if newcandidates:
+                Expand(clique, newcandidates)
+            elif len(clique) > len(state['best']):
+                state['best'] = list(clique)
+            clique.pop()
+            candidates &= ~(1 << node)
+
+    Expand([], (1 << inputs['nbnodes']) - 1)
+    LogInfo('Clique search: ' + str(len(state['best'])) + ' nodes (' + str(state['nodes']) + ' expansions'
+            + (', optimal)' if state['complete'] else ', budget reached)'))
+    return state['best']
+
+# lowest color not forbidden, from a bitset of forbidden colors
+def GetFirstAllowedColor(forbidden):
+    return (~forbidden & (forbidden + 1)).bit_length() - 1
+
+# greedy coloring in a fixed order of the nodes
+def ColorInOrder(inputs, order):
+    adjacentnodes = inputs['adjacentnodes']
+    nodecolors = [-1] * inputs['nbnodes']
+    forbidden = [0] * inputs['nbnodes']   # colors of the neighbors of each node, as bitsets
+    for node in order:
+        color = GetFirstAllowedColor(forbidden[node])
+        nodecolors[node] = color
+        bit = 1 << color
+        for adjacentNode in adjacentnodes[node]:
+            forbidden[adjacentNode] |= bit
+    return nodecolors
+
+# nodes with more neighbors will have priority during color assignment
+def GetDegreeOrder(inputs):
+    return np.argsort(inputs['degrees'], kind='stable')[::-1].tolist()
+
+# smallest-last order: the node of smallest degree is removed from the graph, repeatedly,
+# and the nodes are colored in the reverse order of removal.
+# The nodes are kept in buckets by remaining degree; as removing a node decreases the degrees
+# by one, the smallest non empty bucket is found from the previous one minus one.
+def GetSmallestLastOrder(inputs):
+    adjacentnodes = inputs['adjacentnodes']
+    degrees = inputs['degrees'].tolist()
+    buckets = [set() for _ in range(max(degrees) + 1 if degrees else 0)]
+    for node, degree in enumerate(degrees):
+        buckets[degree].add(node)
+    removed = [False] * inputs['nbnodes']
+    order = []
+    degree = 0
+    for _ in range(inputs['nbnodes']):
+        while not buckets[degree]:
+            degree += 1
+        node = buckets[degree].pop()
+        removed[node] = True
+        order.append(node)
+        for adjacentNode in adjacentnodes[node]:
+            if not removed[adjacentNode]:
+                buckets[degrees[adjacentNode]].remove(adjacentNode)
+                degrees[adjacentNode] -= 1
+                buckets[degrees[adjacentNode]].add(adjacentNode)
+        degree = max(degree - 1, 0)
+    return order[::-1]
+
+# DSATUR: the next node is the one with the most distinct colors among its neighbors (ties
+# broken by degree), taken from a heap with lazy updates, and gets the lowest allowed color.
+def ColorWithDsatur(inputs):
+    adjacentnodes = inputs['adjacentnodes']
+    degrees = inputs['degrees'].tolist()
+    nodecolors = [-1] * inputs['nbnodes']
+    forbidden = [0] * inputs['nbnodes']
+    saturation = [0] * inputs['nbnodes']
+    heap = [(0, -degree, node) for node, degree in enumerate(degrees)]
+    heapq.heapify(heap)
+    while heap:
+        negsaturation, negdegree, node = heapq.heappop(heap)
+        if nodecolors[node] != -1 or -negsaturation != saturation[node]:
+            continue
+        color = GetFirstAllowedColor(forbidden[node])
+        nodecolors[node] = color
+        bit = 1 << color
+        for adjacentNode in adjacentnodes[node]:
+            if nodecolors[adjacentNode] == -1 and not forbidden[adjacentNode] & bit:
+                forbidden[adjacentNode] |= bit
+                saturation[adjacentNode] += 1
+                heapq.heappush(heap, (-saturation[adjacentNode], -degrees[adjacentNode], adjacentNode))
+    return nodecolors
+
+# greedy orderings available in RunGreedyAlgorithm
+GREEDY_ORDERINGS = {
+    'degree': lambda inputs: ColorInOrder(inputs, GetDegreeOrder(inputs)),
+    'smallestlast': lambda inputs: ColorInOrder(inputs, GetSmallestLastOrder(inputs)),
+    'dsatur': ColorWithDsatur,
+}
+
+# greedy coloring with the given ordering (see GREEDY_ORDERINGS); by default, all the orderings
+# are run and the coloring with the least colors is kept
+def RunGreedyAlgorithm(inputs, ordering=None):
+    LogInfo('Start greedy algo...')
 
     # get lower bound on color number
     LogInfo('Searching lower bound...')
-    lbound = 0
-    for n in inputNodes:
-        nlbound = GetGraphColoringLowerBound(inputs, n)
-        if nlbound > lbound:
-            lbound = nlbound
+    lbound = len(GetMaxClique(inputs))
     LogInfo('Lower bound found: ' + str(lbound))
-    
-    LogInfo('Loop on each node...')
-    for node in inputNodes:
-        #print('>> Node ', node)
-        for color in inputs['colors']:
-            #print('    >> Color ', color)
-            # try to assign each color until one is valid
-            # to determine if a color is valid, we look at all adjacent nodes and discard already assigned colors.
-            isAvailable = True
-
-            if node not in inputs['adjacentnodes']:
-                # if the node doesn't have any adjacent nodes, assign the first available color
-                nodecolors[node] = color
-                break
 
-            adjacentNodes = inputs['adjacentnodes'][node]
-            for adjacentNode in adjacentNodes:
-                if adjacentNode in nodecolors:
-                    # if the node already has a color assigned ...
-                    if nodecolors[adjacentNode] == color:
-                        # ... and if the color assigned is the same than the current one, discard it.
-                        isAvailable = False
-                        break
-
-            if isAvailable:
-                nodecolors[node] = color
-                break
+    nodecolors = None
+    for name in [ordering] if ordering is not None else GREEDY_ORDERINGS:
+        colors = GREEDY_ORDERINGS[name](inputs)
+        nbcolors = max(colors) + 1 if colors else 0
+        LogInfo('Greedy ' + name + ': ' + str(nbcolors) + ' colors')
+        if nodecolors is None or nbcolors < max(nodecolors) + 1:
+            nodecolors = colors
 
     output = {}
-    output['objective'] = len(set(nodecolors.values()))
-    output['variables'] = list(nodecolors.values())
+    output['objective'] = max(nodecolors) + 1 if nodecolors else 0
+    output['variables'] = nodecolors
     output['mincolors'] = lbound
     return output
 
+# default budget of the iterated greedy: iterations, and seconds when used as the upper bound
+# of the solvers; a Kempe-chain reduction is tried after ITERATED_STALL iterations without improvement
+ITERATED_MAXITERATIONS = 1000
+ITERATED_TIMELIMIT = 10
+ITERATED_STALL = 50
+
+# orders of the color classes in the iterated greedy, with their probability
+ITERATED_CLASS_ORDERS = {'reverse': 0.5, 'largestfirst': 0.3, 'random': 0.2}
+
+# iterated greedy step (Culberson): the nodes are recolored greedily, class by class, which never
+# uses more colors than the current coloring. The classes are taken in reverse color order,
+# largest first, or in random order.
+def RecolorByClasses(inputs, colors, classorder, random):
+    colors = np.asarray(colors)
+    nbcolors = int(colors.max()) + 1
+    if classorder == 'reverse':
+        ranks = np.arange(nbcolors)[::-1]
+    elif classorder == 'largestfirst':
+        ranks = np.empty(nbcolors, dtype=np.int64)
+        ranks[np.argsort(-np.bincount(colors, minlength=nbcolors), kind='stable')] = np.arange(nbcolors)
+    else:
+        ranks = random.permutation(nbcolors)
+    return ColorInOrder(inputs, np.argsort(ranks[colors], kind='stable').tolist())
+
+# nodes of the Kempe chains (connected components of the subgraph of colors c and d) containing
+# the start nodes
+def GetKempeChain(inputs, colors, starts, c, d):
+    adjacentnodes = inputs['adjacentnodes']
+    chain = set(starts)
+    stack = list(starts)
+    while stack:
+        node = stack.pop()
+        for adjacentNode in adjacentnodes[node]:
+            if adjacentNode not in chain and colors[adjacentNode] in (c, d):
+                chain.add(adjacentNode)
+                stack.append(adjacentNode)
+    return chain
+
+# tries to empty the smallest color class: each of its nodes is moved to another color c, either
+# directly, or after swapping colors c and d on the Kempe chains of its neighbors of color c,
+# provided that the chains contain no neighbor of the node. Returns the coloring with one color
+# less, or None (the colors of the nodes that could be moved are kept), also when the deadline
+# is reached.
+def ReduceSmallestClass(inputs, colors, deadline=None):
+    adjacentnodes = inputs['adjacentnodes']
+    nbcolors = max(colors) + 1
+    sizes = np.bincount(colors, minlength=nbcolors)
+    smallest = int(sizes.argmin())
+    for node in [node for node, color in enumerate(colors) if color == smallest]:
+        neighborcolors = np.bincount([colors[n] for n in adjacentnodes[node]], minlength=nbcolors)
+        moved = False
+        # the colors with the least neighbors first
+        for c in np.argsort(neighborcolors, kind='stable').tolist():
+            if c == smallest:
+                continue
+            starts = [n for n in adjacentnodes[node] if colors[n] == c]
+            if not starts:
+                colors[node] = c
+                moved = True
+                break
+            for d in range(nbcolors):
+                if d in (c, smallest):
+                    continue
+                if deadline is not None and time.time() > deadline:
+                    return None
+                chain = GetKempeChain(inputs, colors, starts, c, d)
+                if any(n in chain for n in adjacentnodes[node] if colors[n] == d):
+                    continue
+                for n in chain:
+                    colors[n] = d if colors[n] == c else c
+                colors[node] = c
+                moved = True
+                break
+            if moved:
+                break
+        if not moved:
+            return None
+    return [color - 1 if color > smallest else color for color in colors]
+
+# anytime improvement of a coloring (the greedy coloring by default): iterated greedy steps with
+# random class orders, and a Kempe-chain reduction of the smallest class when the number of colors
+# stalls. Stops after maxiterations, timelimit seconds, or at the clique lower bound.
+def RunIteratedGreedy(inputs, colors=None, maxiterations=ITERATED_MAXITERATIONS, timelimit=None, seed=None):
+    deadline = time.time() + timelimit if timelimit is not None else None
+    random = np.random.RandomState(seed)
+    greedyoutputs = RunGreedyAlgorithm(inputs)
+    lbound = greedyoutputs['mincolors']
+    best = list(colors) if colors is not None else greedyoutputs['variables']
+    nbcolors = max(best) + 1 if best else 0
+    LogInfo('Start iterated greedy from ' + str(nbcolors) + ' colors...')
+    classorders = list(ITERATED_CLASS_ORDERS)
+    probabilities = list(ITERATED_CLASS_ORDERS.values())
+    current = best
+    stall = 0
+    for iteration in range(maxiterations):
+        if nbcolors <= lbound or (deadline is not None and time.time() > deadline):
+            break
+        current = RecolorByClasses(inputs, current, classorders[random.choice(len(classorders), p=probabilities)], random)
+        stall += 1
+        if stall >= ITERATED_STALL:
+            stall = 0
+            reduced = ReduceSmallestClass(inputs, list(current), deadline)
+            if reduced is not None:
+                current = reduced
+        if max(current) + 1 < nbcolors:
+            best = list(current)
+            nbcolors = max(best) + 1
+            stall = 0
+            LogInfo('Iterated greedy found a coloring with ' + str(nbcolors) + ' colors (iteration '
+                    + str(iteration) + ')')
+
+    outputs = {}
+    outputs['objective'] = nbcolors
+    outputs['variables'] = best
+    outputs['mincolors'] = lbound
+    outputs['optimal'] = nbcolors <= lbound
+    return outputs
+
 def RunSolver(inputs):
     from ortools.linear_solver import pywraplp
 
     solver = pywraplp.Solver('GraphColoringSolver', pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING)
 
-    # Run greedy algorithm first to determine lower and upper bound on the number of colors,
-    # in order to reduce the search space
-    greedyoutputs = RunGreedyAlgorithm(inputs)
-    mincolors = 0
+    # Run greedy algorithm first, improved by the iterated greedy, to determine lower and upper
+    # bound on the number of colors, in order to reduce the search space
+    greedyoutputs = RunIteratedGreedy(inputs, timelimit=ITERATED_TIMELIMIT)
+    mincolors = greedyoutputs['mincolors']
     maxcolors = greedyoutputs['objective']
     colorsrange = range(maxcolors)
     LogInfo('Greedy outputs: mincolors=' + str(mincolors) + '; maxcolors=' + str(maxcolors))
@@ -139,7 +464,8 @@ def RunSolver(inputs):
     objective.SetMinimization()
 
     # Variables
-    y = solver.IntVar(mincolors, maxcolors, 'y')
+    # y is the highest color index: at least the size of a clique minus one
+    y = solver.IntVar(mincolors - 1, maxcolors, 'y')
     objective.SetCoefficient(y, 1)
 
     LogInfo('Add variables...')
@@ -200,18 +526,704 @@ def RunSolver(inputs):
     outputs['variables'] = results
     return outputs
 
-def solve_it(input_data):
+# clique cover of the edges: for each node, in decreasing degree order, each of its edges not yet
+# covered is extended into a clique, with the common neighbors having uncovered edges to the
+# node first, then the other common neighbors.
+def GetCliqueCover(inputs):
+    neighbors = inputs['neighbors']
+    uncovered = list(neighbors)
+    cliques = []
+    for node in GetDegreeOrder(inputs):
+        while uncovered[node]:
+            other = (uncovered[node] & -uncovered[node]).bit_length() - 1
+            clique = [node, other]
+            candidates = neighbors[node] & neighbors[other]
+            for preferred in (candidates & uncovered[node], candidates):
+                preferred &= candidates
+                while preferred:
+                    adjacentNode = (preferred & -preferred).bit_length() - 1
+                    clique.append(adjacentNode)
+                    candidates &= neighbors[adjacentNode]
+                    preferred &= neighbors[adjacentNode]
+            cliquemask = 0
+            for adjacentNode in clique:
+                cliquemask |= 1 << adjacentNode
+            for adjacentNode in clique:
+                uncovered[adjacentNode] &= ~cliquemask
+            cliques.append(clique)
+    return cliques
+
+# assignment formulation: x[v, c] = 1 if node v has color c, w[c] = 1 if color c is used,
+# minimize the number of colors used.
+# - each node has one color
+# - the nodes of each clique of a clique cover (see GetCliqueCover) have distinct colors,
+#   and only the used colors: sum(x[v, c] for v in clique) <= w[c]
+# - the nodes of a maximum clique get the first colors (symmetry breaking)
+# - the colors are used in order: w[c] >= w[c + 1]
+# The number of colors is capped at the greedy upper bound, and the model is built in bulk as an
+# MPModelProto: variable x[v, c] is v * maxcolors + c, and w[c] is nbnodes * maxcolors + c.
+def RunAssignmentSolver(inputs, timelimit=None):
+    from ortools.linear_solver import pywraplp, linear_solver_pb2
+
+    greedyoutputs = RunGreedyAlgorithm(inputs)
+    nbnodes = inputs['nbnodes']
+    maxcolors = greedyoutputs['objective']
+    clique = GetMaxClique(inputs, exact=True)
+    cliques = GetCliqueCover(inputs)
+    LogInfo('Greedy outputs: mincolors=' + str(len(clique)) + '; maxcolors=' + str(maxcolors)
+            + '; clique cover of ' + str(len(cliques)) + ' cliques')
+
+    model = linear_solver_pb2.MPModelProto()
+    model.maximize = False
+    xs = np.arange(nbnodes * maxcolors).reshape(nbnodes, maxcolors)
+    ws = np.arange(maxcolors) + nbnodes * maxcolors
+    lowerbounds = np.zeros(nbnodes * maxcolors + maxcolors)
+    lowerbounds[xs[clique, np.arange(len(clique))]] = 1
+    lowerbounds[ws[:len(clique)]] = 1
+    costs = np.zeros(len(lowerbounds))
+    costs[ws] = 1
+    model.variable.extend(linear_solver_pb2.MPVariableProto(lower_bound=lb, upper_bound=1, is_integer=True,
+                                                            objective_coefficient=cost)
+                          for lb, cost in zip(lowerbounds.tolist(), costs.tolist()))
+    # one color per node
+    ones = [1] * maxcolors
+    model.constraint.extend(linear_solver_pb2.MPConstraintProto(var_index=row, coefficient=ones,
+                                                                lower_bound=1, upper_bound=1)
+                            for row in xs.tolist())
+    # clique constraints; the isolated nodes only need x[v, c] <= w[c]
+    cliques = cliques + [[node] for node in np.flatnonzero(inputs['degrees'] == 0).tolist()]
+    for members in cliques:
+        coefficients = [1] * len(members) + [-1]
+        model.constraint.extend(linear_solver_pb2.MPConstraintProto(var_index=row, coefficient=coefficients,
+                                                                    upper_bound=0)
+                                for row in np.vstack([xs[members], ws]).T.tolist())
+    # colors used in order
+    model.constraint.extend(linear_solver_pb2.MPConstraintProto(var_index=[c, c + 1], coefficient=[1, -1],
+                                                                lower_bound=0)
+                            for c in ws[:-1].tolist())
+
+    solver = pywraplp.Solver('GraphColoringSolver', pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING)
+    error = solver.LoadModelFromProto(model)
+    if error:
+        raise ValueError('invalid model: ' + error)
+    if timelimit is not None:
+        solver.SetTimeLimit(int(timelimit * 1000))
+    LogInfo('Number of variables =' + str(solver.NumVariables()))
+    LogInfo('Number of constraints =' + str(solver.NumConstraints()))
+    LogInfo('Start solving...')
+    status = solver.Solve()
+    LogInfo('Solver finished.')
+
+    outputs = {}
+    outputs['mincolors'] = len(clique)
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        LogInfo('No solution found, keeping the greedy coloring')
+        outputs['objective'] = greedyoutputs['objective']
+        outputs['variables'] = greedyoutputs['variables']
+        outputs['optimal'] = greedyoutputs['objective'] <= len(clique)
+        return outputs
+    response = linear_solver_pb2.MPSolutionResponse()
+    solver.FillSolutionResponseProto(response)
+    values = np.array(response.variable_value)[:nbnodes * maxcolors].reshape(nbnodes, maxcolors)
+    # renumber the colors used from 0
+    colors = np.unique(values.argmax(axis=1), return_inverse=True)[1]
+    outputs['objective'] = int(colors.max()) + 1 if nbnodes else 0
+    outputs['variables'] = colors.tolist()
+    outputs['optimal'] = status == pywraplp.Solver.OPTIMAL or outputs['objective'] <= len(clique)
+    return outputs
+
+# CP-SAT: one integer color per node below k, AllDifferent over the cliques of a clique cover
+# (see GetCliqueCover) of size 3 or more, and != on the edges of the smaller cliques.
+# The nodes of a maximum clique get the first colors, and the greedy coloring is the solution hint.
+# Starting from the greedy coloring, k is set to the best number of colors minus one until the
+# model is infeasible (the best coloring is then optimal) or the time limit is reached.
+# timelimit (in seconds) is shared by all the iterations, and workers is the number of search
+# workers of CP-SAT.
+def RunCPSATSolver(inputs, timelimit=None, workers=8):
+    from ortools.sat.python import cp_model
+
+    deadline = time.time() + timelimit if timelimit is not None else None
+    greedyoutputs = RunGreedyAlgorithm(inputs)
+    clique = GetMaxClique(inputs, exact=True)
+    cliques = GetCliqueCover(inputs)
+    lbound = len(clique)
+    best = greedyoutputs['variables']
+    nbcolors = greedyoutputs['objective']
+    optimal = nbcolors <= lbound
+    LogInfo('Greedy outputs: mincolors=' + str(lbound) + '; maxcolors=' + str(nbcolors))
+
+    while not optimal:
+        remaining = deadline - time.time() if deadline is not None else None
+        if remaining is not None and remaining <= 0:
+            break
+        k = nbcolors - 1
+        model = cp_model.CpModel()
+        colors = [model.NewIntVar(0, k - 1, 'x_' + str(n)) for n in range(inputs['nbnodes'])]
+        for color, node in enumerate(clique):
+            model.Add(colors[node] == color)
+        for members in cliques:
+            if len(members) > 2:
+                model.AddAllDifferent([colors[node] for node in members])
+            else:
+                model.Add(colors[members[0]] != colors[members[1]])
+        for node, color in enumerate(best):
+            model.AddHint(colors[node], min(color, k - 1))
+        solver = cp_model.CpSolver()
+        solver.parameters.num_search_workers = workers
+        if remaining is not None:
+            solver.parameters.max_time_in_seconds = remaining
+        LogInfo('Searching a coloring with ' + str(k) + ' colors...')
+        status = solver.Solve(model)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            # colors unused by the solution are removed
+            solution = [solver.Value(x) for x in colors]
+            used = sorted(set(solution))
+            renumber = dict(zip(used, range(len(used))))
+            best = [renumber[color] for color in solution]
+            nbcolors = len(used)
+            optimal = nbcolors <= lbound
+            LogInfo('CP-SAT found a coloring with ' + str(nbcolors) + ' colors')
+        elif status == cp_model.INFEASIBLE:
+            optimal = True
+        else:
+            break
+
+    outputs = {}
+    outputs['objective'] = nbcolors
+    outputs['variables'] = best
+    outputs['mincolors'] = lbound
+    outputs['optimal'] = optimal
+    return outputs
+
+# exact DSATUR branch and bound.
+# The nodes of a maximum clique (see GetMaxClique, with an exact search of at most cliquemaxnodes
+# expansions) are colored first (with distinct colors), then the uncolored node
+# with the highest saturation (number of distinct colors among its neighbors, ties broken by degree)
+# is branched on, trying each color not used by its neighbors, and a new color only when the
+# coloring can still beat the best one. The first dive is the DSATUR greedy coloring.
+# The colors forbidden for each node are kept in a bitset, updated when a neighbor is (un)colored,
+# and the color classes are bitsets of nodes.
+# The search stops when the best coloring matches the clique lower bound (optimal), or after
+# maxnodes assignments or timelimit seconds (the best coloring is then not proven optimal).
+def RunDsaturBranchAndBound(inputs, maxnodes=None, timelimit=None, cliquemaxnodes=CLIQUE_MAXNODES):
+    LogInfo('Start DSATUR branch and bound...')
+    nbnodes = inputs['nbnodes']
+    neighbors = inputs['neighbors']
+    adjacentnodes = inputs['adjacentnodes']
+    degrees = inputs['degrees'].tolist()
+    clique = GetMaxClique(inputs, exact=True, maxnodes=cliquemaxnodes)
+    lbound = len(clique)
+    LogInfo('Lower bound found: ' + str(lbound))
+    deadline = time.time() + timelimit if timelimit is not None else None
+
+    colors = [-1] * nbnodes
+    classes = [0] * (nbnodes + 1)       # nodes of each color, as bitsets
+    classsizes = [0] * (nbnodes + 1)
+    forbidden = [0] * nbnodes           # colors of the neighbors of each node, as bitsets
+    saturation = [0] * nbnodes
+    uncolored = set(range(nbnodes))
+    state = {'used': 0}
+
+    def Assign(node, color):
+        colors[node] = color
+        classes[color] |= 1 << node
+        classsizes[color] += 1
+        if classsizes[color] == 1:
+            state['used'] += 1
+        uncolored.discard(node)
+        bit = 1 << color
+        for other in adjacentnodes[node]:
+            if colors[other] == -1 and not forbidden[other] & bit:
+                forbidden[other] |= bit
+                saturation[other] += 1
+
+    def Unassign(node):
+        color = colors[node]
+        colors[node] = -1
+        classes[color] &= ~(1 << node)
+        classsizes[color] -= 1
+        if classsizes[color] == 0:
+            state['used'] -= 1
+        bit = 1 << color
+        for other in adjacentnodes[node]:
+            # the color stays forbidden if another neighbor has it
+            if colors[other] == -1 and not neighbors[other] & classes[color]:
+                forbidden[other] &= ~bit
+                saturation[other] -= 1
+        uncolored.add(node)
+
+    def SelectNode():
+        return max(uncolored, key=lambda node: (saturation[node], degrees[node]))
+
+    def GetCandidates(node):
+        used = state['used']
+        return [color for color in range(used) if not forbidden[node] >> color & 1] + [used]
+
+    for color, node in enumerate(clique):
+        Assign(node, color)
+    best = list(colors) if not uncolored else None
+    ubound = state['used'] if not uncolored else nbnodes + 1
+    nodes = 0
+    stack = [[SelectNode(), None, 0]] if uncolored else []
+    while stack and ubound > lbound:
+        # the budget only applies once a first coloring was found
+        if best is not None and ((maxnodes is not None and nodes >= maxnodes)
+                                 or (deadline is not None and time.time() > deadline)):
+            LogInfo('DSATUR budget reached')
+            break
+        frame = stack[-1]
+        node = frame[0]
+        if frame[1] is None:
+            frame[1] = GetCandidates(node)
+        else:
+            Unassign(node)
+        # only the colors that keep the coloring strictly better than the best one: after the
+        # assignment, the partial coloring must use less colors than the best coloring
+        if frame[2] < len(frame[1]) and max(state['used'], frame[1][frame[2]] + 1) < ubound:
+            Assign(node, frame[1][frame[2]])
+            frame[2] += 1
+            nodes += 1
+            if uncolored:
+                stack.append([SelectNode(), None, 0])
+            else:
+                best = list(colors)
+                ubound = state['used']
+                LogInfo('New coloring found: ' + str(ubound) + ' colors (' + str(nodes) + ' nodes)')
+        else:
+            stack.pop()
+    optimal = not stack or ubound <= lbound
+    LogInfo('DSATUR finished: ' + str(ubound) + ' colors, ' + str(nodes) + ' nodes'
+            + (' (optimal)' if optimal else ''))
+
+    outputs = {}
+    outputs['objective'] = ubound
+    outputs['variables'] = best
+    outputs['mincolors'] = lbound
+    outputs['optimal'] = optimal
+    return outputs
+
+# default parameters of the tabu search: iterations per number of colors, and tabu tenure
+# (a random number of iterations below TABU_TENURE, plus TABU_TENURE_FACTOR times the number of
+# conflicting nodes)
+TABU_MAXITERATIONS = 100000
+TABU_TENURE = 10
+TABU_TENURE_FACTOR = 0.6
+
+# TabuCol: searches a coloring with k colors without conflict, starting from 'colors'.
+# gamma[v, c] is the number of neighbors of v with color c, so that moving v to color c changes
+# the number of conflicts by gamma[v, c] - gamma[v, colors[v]]. At each iteration, the best move
+# of a conflicting node is applied (ties broken at random), and moving the node back to its old
+# color is tabu for the next iterations, unless it gives less conflicts than ever (aspiration).
+# gamma is updated incrementally on the neighbors of the moved node.
+# Returns the coloring without conflict, or None if not found within the budget.
+def RunTabuCol(inputs, k, colors, maxiterations=TABU_MAXITERATIONS, deadline=None, random=None,
+               tenure=TABU_TENURE, tenurefactor=TABU_TENURE_FACTOR, aspiration=True):
+    colors, conflicts = RunTabuColSearch(inputs, k, colors, maxiterations, deadline, random,
+                                         tenure, tenurefactor, aspiration)
+    return colors if conflicts == 0 else None
+
+# same as RunTabuCol, returning the coloring with the least conflicts found and its conflicts
+def RunTabuColSearch(inputs, k, colors, maxiterations=TABU_MAXITERATIONS, deadline=None, random=None,
+                     tenure=TABU_TENURE, tenurefactor=TABU_TENURE_FACTOR, aspiration=True):
+    if random is None:
+        random = np.random.RandomState()
+    nbnodes = inputs['nbnodes']
+    indptr = inputs['indptr']
+    indices = inputs['indices']
+    nodes = np.arange(nbnodes)
+    colors = np.array(colors, dtype=np.int64)
+    gamma = np.zeros((nbnodes, k), dtype=np.int64)
+    np.add.at(gamma, (np.repeat(nodes, inputs['degrees']), colors[indices]), 1)
+    tabu = np.zeros((nbnodes, k), dtype=np.int64)
+    conflicts = int(gamma[nodes, colors].sum()) // 2
+    bestconflicts = conflicts
+    best = colors.copy()
+    for iteration in range(maxiterations):
+        if conflicts == 0:
+            break
+        if iteration % 1000 == 0 and deadline is not None and time.time() > deadline:
+            break
+        conflicting = np.flatnonzero(gamma[nodes, colors] > 0)
+        current = colors[conflicting]
+        deltas = gamma[conflicting] - gamma[conflicting, current][:, None]
+        deltas[np.arange(len(conflicting)), current] = nbnodes
+        allowed = tabu[conflicting] <= iteration
+        if aspiration:
+            allowed |= conflicts + deltas < bestconflicts
+        deltas[~allowed] = nbnodes
+        moves = np.flatnonzero(deltas == deltas.min())
+        move = moves[random.randint(len(moves))]
+        i, color = divmod(int(move), k)
+        if deltas[i, color] >= nbnodes:
+            # every move is tabu
+            continue
+        node = int(conflicting[i])
+        oldcolor = int(colors[node])
+        adjacentNodes = indices[indptr[node]:indptr[node + 1]]
+        gamma[adjacentNodes, oldcolor] -= 1
+        gamma[adjacentNodes, color] += 1
+        colors[node] = color
+        conflicts += int(deltas[i, color])
+        tabu[node, oldcolor] = iteration + random.randint(tenure) + int(tenurefactor * len(conflicting))
+        if conflicts < bestconflicts:
+            bestconflicts = conflicts
+            best = colors.copy()
+    return best.tolist(), bestconflicts
+
+# tabu search in a loop decreasing the number of colors, starting from the greedy coloring:
+# the nodes of the highest color get a random color among the others, and TabuCol removes the
+# conflicts. Stops when no coloring is found within the budget (maxiterations per number of
+# colors, timelimit in total), or when the clique lower bound is reached (optimal).
+def RunTabuSearch(inputs, maxiterations=TABU_MAXITERATIONS, timelimit=None, seed=None,
+                  tenure=TABU_TENURE, tenurefactor=TABU_TENURE_FACTOR, aspiration=True):
+    deadline = time.time() + timelimit if timelimit is not None else None
+    random = np.random.RandomState(seed)
+    greedyoutputs = RunGreedyAlgorithm(inputs)
+    lbound = greedyoutputs['mincolors']
+    best = greedyoutputs['variables']
+    k = greedyoutputs['objective']
+    LogInfo('Start tabu search from ' + str(k) + ' colors...')
+    while k > lbound and (deadline is None or time.time() < deadline):
+        colors = np.array(best)
+        highest = colors == k - 1
+        colors[highest] = random.randint(k - 1, size=int(highest.sum()))
+        colors = RunTabuCol(inputs, k - 1, colors, maxiterations, deadline, random, tenure, tenurefactor, aspiration)
+        if colors is None:
+            break
+        k -= 1
+        best = colors
+        LogInfo('Tabu search found a coloring with ' + str(k) + ' colors')
+
+    outputs = {}
+    outputs['objective'] = k
+    outputs['variables'] = best
+    outputs['mincolors'] = lbound
+    outputs['optimal'] = k <= lbound
+    return outputs
+
+# default parameters of the hybrid evolutionary algorithm: population size, tabu iterations
+# per offspring, and minimum distance of an offspring to the population (as a fraction of the nodes)
+HEA_POPULATION = 10
+HEA_MAXITERATIONS = 10000
+HEA_MINDISTANCE = 0.01
+
+# graph of the HEA worker processes, attached to the shared memory of the main process
+HEA_GRAPH = {}
+
+# greedy partition crossover: the child takes, alternately from each parent, the color class with
+# the most nodes not yet colored; the nodes left after k classes get random colors
+def GetGPXChild(parent1, parent2, k, random):
+    parents = [np.asarray(parent1), np.asarray(parent2)]
+    child = np.full(len(parents[0]), -1, dtype=np.int64)
+    remaining = np.ones(len(child), dtype=bool)
+    for color in range(k):
+        parent = parents[color % 2]
+        largest = np.bincount(parent[remaining], minlength=k).argmax()
+        colorclass = remaining & (parent == largest)
+        child[colorclass] = color
+        remaining &= ~colorclass
+    child[remaining] = random.randint(k, size=int(remaining.sum()))
+    return child
+
+# distance between two colorings: number of nodes to recolor to get the same partition, with the
+# color classes matched greedily by their number of common nodes
+def GetPartitionDistance(colors1, colors2, k):
+    common = np.zeros((k, k), dtype=np.int64)
+    np.add.at(common, (np.asarray(colors1), np.asarray(colors2)), 1)
+    matched = 0
+    for _ in range(k):
+        i, j = np.unravel_index(common.argmax(), common.shape)
+        if common[i, j] == 0:
+            break
+        matched += common[i, j]
+        common[i, :] = -1
+        common[:, j] = -1
+    return len(colors1) - int(matched)
+
+# the CSR arrays of the graph are copied once into shared memory, and attached by each worker
+def InitHEAWorker(nbnodes, names, shapes):
+    from multiprocessing import shared_memory
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    indptr, indices = [np.ndarray(shape, dtype=np.int64, buffer=block.buf) for block, shape in zip(blocks, shapes)]
+    HEA_GRAPH['blocks'] = blocks
+    HEA_GRAPH['nbnodes'] = nbnodes
+    HEA_GRAPH['indptr'] = indptr
+    HEA_GRAPH['indices'] = indices
+    HEA_GRAPH['degrees'] = np.diff(indptr)
+
+# one offspring: GPX crossover of the parents (or a copy of parent1 when parent2 is None),
+# improved by TabuCol until the deadline. Returns the coloring and its number of conflicts.
+def RunHEAOffspring(task):
+    parent1, parent2, k, seed, maxiterations, deadline = task
+    random = np.random.RandomState(seed)
+    child = GetGPXChild(parent1, parent2, k, random) if parent2 is not None else parent1
+    return RunTabuColSearch(HEA_GRAPH, k, child, maxiterations, deadline, random)
+
+# hybrid evolutionary algorithm (Galinier and Hao): a population of k-colorings, with conflicts,
+# is improved by crossing random pairs of parents with GPX and running TabuCol on the offspring.
+# An offspring replaces the worst member of the population, unless it is closer than
+# mindistance to a member (see GetPartitionDistance) without improving the best one, to keep
+# the population diverse. When a coloring without conflict is found, k is decreased.
+# The offspring of each generation are evaluated in parallel by the workers, which share the CSR
+# arrays of the graph through shared memory instead of receiving the graph with each task.
+# Stops after the given number of generations, timelimit seconds, or at the clique lower bound.
+def RunHybridEvolutionary(inputs, population=HEA_POPULATION, workers=None, generations=None,
+                          maxiterations=HEA_MAXITERATIONS, mindistance=HEA_MINDISTANCE, timelimit=None, seed=None):
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    if population < 2:
+        raise ValueError('the HEA population needs at least 2 members, got ' + str(population))
+    deadline = time.time() + timelimit if timelimit is not None else None
+    random = np.random.RandomState(seed)
+    workers = workers or os.cpu_count() or 1
+    nbnodes = inputs['nbnodes']
+    greedyoutputs = RunGreedyAlgorithm(inputs)
+    lbound = greedyoutputs['mincolors']
+    best = greedyoutputs['variables']
+    k = greedyoutputs['objective']
+    mindistance = int(mindistance * nbnodes)
+
+    arrays = [np.ascontiguousarray(inputs['indptr'], dtype=np.int64), np.ascontiguousarray(inputs['indices'], dtype=np.int64)]
+    blocks = [shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1)) for array in arrays]
+    try:
+        for block, array in zip(blocks, arrays):
+            np.ndarray(array.shape, dtype=np.int64, buffer=block.buf)[:] = array
+        with ProcessPoolExecutor(max_workers=workers, initializer=InitHEAWorker,
+                                 initargs=(nbnodes, [block.name for block in blocks], [array.shape for array in arrays])) as executor:
+            generation = 0
+            members = []
+            # members is empty until a search with k colors is started
+            while (members or k > lbound) and (generations is None or generation < generations) \
+                    and (deadline is None or time.time() < deadline):
+                if not members:
+                    # initial population: the best coloring, with the nodes of the colors >= k
+                    # recolored at random, improved by TabuCol
+                    k -= 1
+                    LogInfo('HEA: searching a coloring with ' + str(k) + ' colors...')
+                    tasks = []
+                    for _ in range(population):
+                        colors = np.array(best)
+                        highest = colors >= k
+                        colors[highest] = random.randint(k, size=int(highest.sum()))
+                        tasks.append((colors, None, k, random.randint(2**31), maxiterations, deadline))
+                    crossover = False
+                else:
+                    tasks = []
+                    for _ in range(workers):
+                        i, j = random.choice(len(members), 2, replace=False)
+                        tasks.append((members[i][0], members[j][0], k, random.randint(2**31), maxiterations, deadline))
+                    generation += 1
+                    crossover = True
+                found = None
+                for colors, conflicts in executor.map(RunHEAOffspring, tasks):
+                    if conflicts == 0:
+                        found = colors
+                        break
+                    if len(members) < population:
+                        members.append((colors, conflicts))
+                        continue
+                    bestconflicts = min(conflicts for _, conflicts in members)
+                    distance = min(GetPartitionDistance(colors, member, k) for member, _ in members)
+                    if distance < mindistance and conflicts >= bestconflicts:
+                        continue
+                    worst = max(range(len(members)), key=lambda i: members[i][1])
+                    if conflicts <= members[worst][1]:
+                        members[worst] = (colors, conflicts)
+                if found is not None:
+                    best = found
+                    members = []
+                    LogInfo('HEA found a coloring with ' + str(k) + ' colors (generation ' + str(generation) + ')')
+                elif crossover and generation % 10 == 0:
+                    LogInfo('HEA generation ' + str(generation) + ': least conflicts '
+                            + str(min(conflicts for _, conflicts in members)))
+            if members:
+                # the last search failed
+                k += 1
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    outputs = {}
+    outputs['objective'] = k
+    outputs['variables'] = best
+    outputs['mincolors'] = lbound
+    outputs['optimal'] = k <= lbound
+    return outputs
+
+# nodes of degree lower than mincolors, removed repeatedly from the graph: given at least
+# mincolors colors, they can always be colored last, in the reverse order of removal.
+# Returns the removed nodes, in order of removal.
+def GetPeeledNodes(inputs, mincolors):
+    adjacentnodes = inputs['adjacentnodes']
+    degrees = inputs['degrees'].tolist()
+    removed = [False] * inputs['nbnodes']
+    stack = [node for node, degree in enumerate(degrees) if degree < mincolors]
+    for node in stack:
+        removed[node] = True
+    peeled = []
+    while stack:
+        node = stack.pop()
+        peeled.append(node)
+        for adjacentNode in adjacentnodes[node]:
+            degrees[adjacentNode] -= 1
+            if not removed[adjacentNode] and degrees[adjacentNode] < mincolors:
+                removed[adjacentNode] = True
+                stack.append(adjacentNode)
+    return peeled
+
+# connected components of the graph without the excluded nodes, as sorted lists of nodes
+def GetConnectedComponents(inputs, excluded=()):
+    adjacentnodes = inputs['adjacentnodes']
+    visited = [False] * inputs['nbnodes']
+    for node in excluded:
+        visited[node] = True
+    components = []
+    for start in range(inputs['nbnodes']):
+        if visited[start]:
+            continue
+        visited[start] = True
+        component = [start]
+        for node in component:
+            for adjacentNode in adjacentnodes[node]:
+                if not visited[adjacentNode]:
+                    visited[adjacentNode] = True
+                    component.append(adjacentNode)
+        components.append(sorted(component))
+    return components
+
+# inputs of the subgraph induced by the given nodes, renumbered from 0 in the same order
+def GetSubInputs(inputs, nodes):
+    renumber = np.full(inputs['nbnodes'], -1, dtype=np.int64)
+    renumber[nodes] = np.arange(len(nodes))
+    startnodes = renumber[inputs['startnodes']]
+    endnodes = renumber[inputs['endnodes']]
+    kept = (startnodes >= 0) & (endnodes >= 0)
+    return GetGraphInputs(len(nodes), np.stack([startnodes[kept], endnodes[kept]], axis=1))
+
+def SolveComponent(task):
+    subinputs, engine, options = task
+    return ENGINES[engine](subinputs, **options)
+
+# decomposition: the nodes of degree lower than the clique lower bound are peeled (see
+# GetPeeledNodes), and each connected component of the remaining graph is colored independently
+# by the given engine, over a pool of worker processes. The components reuse the same colors, so
+# the number of colors is the maximum over the components; the peeled nodes are then colored
+# with the lowest color not used by their neighbors.
+# componentworkers is the number of processes of the pool, and the extra keyword options
+# (e.g. timelimit, or workers for 'cpsat' and 'hea') are forwarded to the engine of each component.
+# example: solve_it(input_data, 'components', engine='cpsat', componentworkers=4, workers=2, timelimit=10)
+def RunDecomposition(inputs, engine='tabu', componentworkers=None, peel=True, **options):
+    from concurrent.futures import ProcessPoolExecutor
+
+    lbound = len(GetMaxClique(inputs, exact=True))
+    peeled = GetPeeledNodes(inputs, lbound) if peel else []
+    components = GetConnectedComponents(inputs, peeled)
+    components.sort(key=len, reverse=True)
+    LogInfo('Decomposition: ' + str(len(peeled)) + ' nodes peeled, ' + str(len(components)) + ' components'
+            + (' (largest: ' + str(len(components[0])) + ' nodes)' if components else ''))
+
+    tasks = [(GetSubInputs(inputs, component), engine, options) for component in components]
+    if len(tasks) > 1:
+        componentworkers = min(componentworkers or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=componentworkers) as executor:
+            results = list(executor.map(SolveComponent, tasks))
+    else:
+        results = [SolveComponent(task) for task in tasks]
+
+    nodecolors = [-1] * inputs['nbnodes']
+    nbcolors = 0
+    optimal = False
+    for component, outputs in zip(components, results):
+        # colors renumbered from 0 in each component
+        colors = np.unique(outputs['variables'], return_inverse=True)[1].tolist()
+        for node, color in zip(component, colors):
+            nodecolors[node] = color
+        if max(colors) + 1 > nbcolors:
+            nbcolors = max(colors) + 1
+            optimal = outputs.get('optimal', False)
+        elif max(colors) + 1 == nbcolors:
+            optimal = optimal or outputs.get('optimal', False)
+    forbidden = [0] * inputs['nbnodes']
+    for node, color in enumerate(nodecolors):
+        if color >= 0:
+            for adjacentNode in inputs['adjacentnodes'][node]:
+                forbidden[adjacentNode] |= 1 << color
+    for node in reversed(peeled):
+        color = GetFirstAllowedColor(forbidden[node])
+        nodecolors[node] = color
+        nbcolors = max(nbcolors, color + 1)
+        for adjacentNode in inputs['adjacentnodes'][node]:
+            forbidden[adjacentNode] |= 1 << color
+
+    outputs = {}
+    outputs['objective'] = nbcolors
+    outputs['variables'] = nodecolors
+    outputs['mincolors'] = lbound
+    outputs['optimal'] = optimal or nbcolors <= lbound
+    return outputs
+
+# available engines, selected with the 'method' argument of solve_it
+ENGINES = {
+    'greedy': RunGreedyAlgorithm,
+    'iterated': RunIteratedGreedy,
+    'mip': RunSolver,
+    'assignment': RunAssignmentSolver,
+    'cpsat': RunCPSATSolver,
+    'dsatur': RunDsaturBranchAndBound,
+    'tabu': RunTabuSearch,
+    'hea': RunHybridEvolutionary,
+    'components': RunDecomposition,
+}
+
+# True if no edge has both nodes of the same color
+def IsValidColoring(inputs, colors):
+    colors = np.asarray(colors)
+    return bool(np.all(colors[inputs['startnodes']] != colors[inputs['endnodes']])) if inputs['nbedges'] else True
+
+# regression check of the DSATUR branch and bound against CP-SAT: both colorings must be valid,
+# and a number of colors proven optimal by one engine can't be beaten by the other one
+# (nor differ from the other one when both are proven). Returns the instances that fail.
+# example: CheckDsaturAgainstCPSAT('./data/gc_[57]0_*')
+def CheckDsaturAgainstCPSAT(pattern='./data/gc_[57]0_*', timelimit=60):
+    import glob
+    failures = []
+    for file_location in sorted(glob.glob(pattern)):
+        if file_location.endswith(CACHE_EXTENSION):
+            continue
+        inputs = GetInputs(ReadFile(file_location))
+        dsatur = RunDsaturBranchAndBound(inputs, timelimit=timelimit)
+        cpsat = RunCPSATSolver(inputs, timelimit=timelimit)
+        failed = not IsValidColoring(inputs, dsatur['variables']) or not IsValidColoring(inputs, cpsat['variables'])
+        for proven, other in ((dsatur, cpsat), (cpsat, dsatur)):
+            if proven['optimal'] and (other['objective'] < proven['objective']
+                                      or (other['optimal'] and other['objective'] != proven['objective'])):
+                failed = True
+        LogInfo(file_location + ': dsatur ' + str(dsatur['objective']) + (' (optimal)' if dsatur['optimal'] else '')
+                + ', cpsat ' + str(cpsat['objective']) + (' (optimal)' if cpsat['optimal'] else '')
+                + (' FAILED' if failed else ''))
+        if failed:
+            failures.append(file_location)
+    LogInfo(str(len(failures)) + ' failed instances')
+    return failures
+
+# extra keyword options are forwarded to the selected engine, e.g. timelimit for 'dsatur'
+def solve_it(input_data, method='mip', **options):
     # Modify this code to run your optimization algorithm
 
     # parse the input
     inputs = GetInputs(input_data)
+    return SolveInputs(inputs, method, **options)
 
+# same as solve_it, on parsed inputs (e.g. from ReadInputs)
+def SolveInputs(inputs, method='mip', **options):
     #greedyoutputs = RunGreedyAlgorithm(inputs['nodes'], inputs)
     #outputs = greedyoutputs
-    outputs = RunSolver(inputs)
+    outputs = ENGINES[method](inputs, **options)
     
     # prepare the solution in the specified output format
-    output_data = str(outputs['objective']) + ' ' + str(0) + '\n'
+    output_data = str(outputs['objective']) + ' ' + str(int(outputs.get('optimal', False))) + '\n'
     output_data += ' '.join(map(str, outputs['variables'])) 
     return output_data
 
@@ -222,9 +1234,7 @@ if __name__ == '__main__':
     import sys
     if len(sys.argv) > 1:
         file_location = sys.argv[1].strip()
-        with open(file_location, 'r') as input_data_file:
-            input_data = input_data_file.read()
-        print(solve_it(input_data))
+        method = sys.argv[2].strip() if len(sys.argv) > 2 else 'mip'
+        print(SolveInputs(ReadInputs(file_location), method))
     else:
         print('This test requires an input file.  Please select one from the data directory. (i.e. python solver.py ./data/gc_4_1)')
-